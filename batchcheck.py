@@ -0,0 +1,140 @@
+import sys, time, argparse
+import numpy as np
+
+"""
+vectorized checks for many boards at once, boards are an (N, 9, 9) uint8 array with 0 for blanks
+    check(boards)       per board validity, no digit twice in a row, column or box
+    conflicts(boards)   per cell, True where the cell's digit also appears elsewhere in its row, column or box
+    candidates(boards)  per cell 9 bit candidate mask (bit d-1 set when d fits), 0 for filled cells
+every function works on the whole array with a handful of numpy operations, no python loop over boards or cells
+python batchcheck.py bank.txt|puzzles.bank   audits every puzzle and solution of a batchgen file or a puzzle bank
+"""
+
+ALL = 0x1FF
+BIT = np.array([0] + [1 << d for d in range(9)] + [0]*246, dtype=np.uint16) # digit -> mask, 0 and anything above 9 -> 0
+BOX = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+# the 27 units as flat cell indexes (rows, then columns, then boxes) and the three units of every cell
+UNITS = np.array([[r*9 + c for c in range(9)] for r in range(9)] +
+                 [[r*9 + c for r in range(9)] for c in range(9)] +
+                 [[i for i in range(81) if BOX[i] == b] for b in range(9)])
+CELL_UNITS = np.array([[i // 9, 9 + i % 9, 18 + BOX[i]] for i in range(81)])
+CHUNK = 8192 # boards per step, small enough for the working arrays to stay in cache, much faster than the whole array at once
+
+def to_array(grids):
+    # (N, 9, 9) uint8 array from 9x9 lists, flat sequences of 81 digits or 81 character strings ("." for blanks)
+    out = np.zeros((len(grids), 81), dtype=np.uint8)
+    for k, grid in enumerate(grids):
+        if isinstance(grid, str):
+            out[k] = np.frombuffer(grid.replace(".", "0").encode(), dtype=np.uint8) - 48
+        elif len(grid) == 81:
+            out[k] = grid
+        else:
+            out[k] = [d for row in grid for d in row]
+    return out.reshape(-1, 9, 9)
+
+def chunks(boards):
+    # (start, flat chunk) pairs over an (N, 9, 9) array, each chunk is (n, 81)
+    flat = np.asarray(boards, dtype=np.uint8).reshape(-1, 81)
+    for at in range(0, len(flat), CHUNK):
+        yield at, flat[at:at + CHUNK]
+
+def unit_bits(flat):
+    # (n, 27, 9) digit masks of the cells of every unit
+    return BIT[flat][:, UNITS]
+
+def check(boards, complete=False):
+    # (N,) bool, True for boards where no digit repeats in a unit (and without blanks if complete)
+    # the masks of distinct digits add up to the same as they OR to, a repeated digit makes the sum bigger
+    out = np.empty(len(boards), dtype=bool)
+    for at, flat in chunks(boards):
+        units = unit_bits(flat)
+        ok = (units.sum(axis=2, dtype=np.uint16) == np.bitwise_or.reduce(units, axis=2)).all(axis=1)
+        ok &= (flat <= 9).all(axis=1)
+        if complete:
+            ok &= (flat != 0).all(axis=1)
+        out[at:at + len(flat)] = ok
+    return out
+
+def conflicts(boards):
+    # (N, 9, 9) bool, True for filled cells whose digit is repeated in their row, column or box
+    out = np.empty((len(boards), 81), dtype=bool)
+    for at, flat in chunks(boards):
+        units = unit_bits(flat)
+        seen = np.bitwise_or.accumulate(units, axis=2) # digits in the first k+1 cells of each unit
+        repeated = np.bitwise_or.reduce(units[:, :, 1:] & seen[:, :, :-1], axis=2) # digits met a second time, (n, 27)
+        cell = repeated[:, CELL_UNITS] # (n, 81, 3)
+        out[at:at + len(flat)] = (BIT[flat] & (cell[:, :, 0] | cell[:, :, 1] | cell[:, :, 2])) != 0
+    return out.reshape(-1, 9, 9)
+
+def candidates(boards):
+    # (N, 9, 9) uint16 candidate masks of the empty cells, filled cells get 0
+    out = np.empty((len(boards), 81), dtype=np.uint16)
+    for at, flat in chunks(boards):
+        used = np.bitwise_or.reduce(unit_bits(flat), axis=2)[:, CELL_UNITS] # (n, 81, 3)
+        free = ~(used[:, :, 0] | used[:, :, 1] | used[:, :, 2]) & ALL
+        out[at:at + len(flat)] = np.where(flat == 0, free, 0)
+    return out.reshape(-1, 9, 9)
+
+def load_text(path):
+    # (puzzles, solutions) arrays from a batchgen.py file, lines that don't parse are skipped
+    from batchgen import parse_line
+    puzzles = []
+    solutions = []
+    with open(path) as f:
+        for line in f:
+            parsed = parse_line(line)
+            if parsed:
+                puzzles.append(parsed[0])
+                solutions.append(parsed[1])
+    if not puzzles:
+        return np.zeros((0, 9, 9), np.uint8), np.zeros((0, 9, 9), np.uint8)
+    puzzles = np.frombuffer("".join(puzzles).encode(), dtype=np.uint8) - 48
+    solutions = np.frombuffer("".join(solutions).encode(), dtype=np.uint8) - 48
+    return puzzles.reshape(-1, 9, 9), solutions.reshape(-1, 9, 9)
+
+def load_bank(path):
+    # (puzzles, solutions) arrays of every record of a puzzle bank, unpacked without a python loop over records
+    import puzzleBank
+    bank = puzzleBank.PuzzleBank(path)
+    records = np.frombuffer(bank.data, dtype=np.uint8, count=bank.total * puzzleBank.RECORD, offset=bank.offset)
+    records = records.reshape(-1, puzzleBank.RECORD)
+    packed = records[:, :puzzleBank.SOLUTION]
+    solutions = np.stack([packed >> 4, packed & 15], axis=2).reshape(-1, 82)[:, :81]
+    givens = np.unpackbits(records[:, puzzleBank.SOLUTION:puzzleBank.SOLUTION + puzzleBank.GIVENS], axis=1, bitorder="little")[:, :81]
+    puzzles = solutions * givens
+    del records, packed
+    bank.close()
+    return puzzles.reshape(-1, 9, 9), solutions.reshape(-1, 9, 9)
+
+def audit(puzzles, solutions):
+    # counts of the boards failing each check, a puzzle has to be valid and agree with its solution on every given
+    bad = {
+        "puzzle": int((~check(puzzles)).sum()),
+        "solution": int((~check(solutions, complete=True)).sum()),
+        "mismatch": int(((puzzles != 0) & (puzzles != solutions)).any(axis=(1, 2)).sum()),
+        "stuck": int(((puzzles == 0) & (candidates(puzzles) == 0)).any(axis=(1, 2)).sum()), # an empty cell no digit fits
+    }
+    return bad
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="audit the puzzles of a batchgen file or a puzzle bank")
+    parser.add_argument("path", help="batchgen.py text file or puzzleBank.py bank")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with open(args.path, "rb") as f:
+        is_bank = f.read(4) == b"SDKB"
+    puzzles, solutions = load_bank(args.path) if is_bank else load_text(args.path)
+    loaded = time.perf_counter()
+    bad = audit(puzzles, solutions)
+    done = time.perf_counter()
+
+    n = len(puzzles)
+    print("%d puzzles loaded in %.2f s, checked in %.2f s (%.0f boards/s)" % (
+        n, loaded - start, done - loaded, n / (done - loaded) if done > loaded else 0.0))
+    for name in sorted(bad):
+        print("%-9s %d bad" % (name, bad[name]))
+    return 1 if any(bad.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import os, sys, time, argparse
+from multiprocessing import Pool
+
+"""
+makes large numbers of unique puzzles across a process pool and streams them to a puzzle bank text file
+one puzzle per line:
+    <81 digit puzzle> <81 digit solution> <difficulty> seed=<seed> blanks=<blanks> attempts=<n> checks=<n> score=<rating> ms=<ms>
+every puzzle has its own seed, so the same command always makes the same puzzles whatever the number of workers,
+and running it again on the same file only makes the puzzles that are missing
+with --dedup a puzzle that is a relabeled, shuffled or transposed copy of one already in the file (see canonical.py)
+is dropped instead of written, so a difficulty can end up with a few less than --count; the seeds dropped go to
+<out>.dropped, one per line, so resuming with --dedup doesn't make them again
+"""
+
+from sudokuGen import make_level, IMPOSSIBLE
+
+DIFFICULTIES = (44, 50, 58, IMPOSSIBLE)
+
+def task_seed(base, diff, k):
+    # seed of the k-th puzzle of a difficulty
+    return (base * 100 + diff) * 10**8 + k
+
+def make_line(task):
+    # worker, makes one puzzle and formats it as a line
+    diff, seed = task
+    puzzle, sol, stats = make_level(diff, seed=seed, timed=False) # no time budget so the result only depends on the seed
+    return "%s %s %d seed=%d blanks=%d attempts=%d checks=%d score=%d ms=%.1f\n" % (
+        "".join(str(d) for row in puzzle for d in row),
+        "".join(str(d) for row in sol for d in row),
+        diff, seed, stats["blanks"], stats["attempts"], stats["checks"], stats["score"], stats["seconds"] * 1000)
+
+def parse_line(line):
+    # (puzzle, solution, difficulty, stats) from a line, None if the line is damaged
+    parts = line.split()
+    if len(parts) < 4 or len(parts[0]) != 81 or len(parts[1]) != 81 or not parts[2].isdigit():
+        return None
+    try:
+        stats = dict(part.split("=", 1) for part in parts[3:])
+    except ValueError:
+        return None
+    if "seed" not in stats:
+        return None
+    return parts[0], parts[1], int(parts[2]), stats
+
+def done_seeds(path):
+    # seeds already in the file, drops a half written last line left by an interrupted run
+    seeds = set()
+    if not os.path.exists(path):
+        return seeds
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end) # last line was cut off
+        for line in data[:end].decode().splitlines():
+            parsed = parse_line(line)
+            if parsed:
+                seeds.add(int(parsed[3]["seed"]))
+    return seeds
+
+def dropped_seeds(path):
+    # seeds --dedup dropped as duplicates, from the <out>.dropped file next to path
+    seeds = set()
+    if os.path.exists(path + ".dropped"):
+        with open(path + ".dropped") as f:
+            for line in f:
+                if line.strip().isdigit(): # skips a half written last line
+                    seeds.add(int(line))
+    return seeds
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="make many unique puzzles in parallel and append them to a file")
+    parser.add_argument("out", help="puzzle bank text file, appended to")
+    parser.add_argument("--count", type=int, default=1000, help="puzzles per difficulty")
+    parser.add_argument("--difficulty", type=int, action="append", choices=DIFFICULTIES, help="blank count, repeat for several (default all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0, help="base seed, each puzzle's seed is derived from it")
+    parser.add_argument("--chunk", type=int, default=8, help="puzzles handed to a worker at a time")
+    parser.add_argument("--dedup", action="store_true", help="drop puzzles that are symmetric copies of ones already made")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    diffs = args.difficulty or DIFFICULTIES
+    done = done_seeds(args.out)
+    dropped = dropped_seeds(args.out) if args.dedup else set()
+    tasks = [(diff, task_seed(args.seed, diff, k)) for diff in diffs for k in range(args.count)]
+    todo = [task for task in tasks if task[1] not in done and task[1] not in dropped]
+    if not args.quiet and len(todo) < len(tasks):
+        print("resuming, %d of %d puzzles already in %s or dropped as duplicates" % (
+            len(tasks) - len(todo), len(tasks), args.out), file=sys.stderr)
+
+    index = None
+    if args.dedup:
+        from canonical import DedupIndex
+        index = DedupIndex()
+        if os.path.exists(args.out):
+            with open(args.out) as f:
+                for line in f:
+                    parsed = parse_line(line)
+                    if parsed:
+                        index.add(parsed[0])
+        index.duplicates = 0 # only count what this run drops
+
+    start = last = time.perf_counter()
+    made = 0
+    skipped = open(args.out + ".dropped", "a") if args.dedup else None
+    with open(args.out, "a") as out, Pool(args.workers) as pool:
+        for line in pool.imap_unordered(make_line, todo, args.chunk):
+            if index is not None and not index.add(line[:81]):
+                skipped.write(parse_line(line)[3]["seed"] + "\n") # same puzzle as one already written, up to symmetry
+            else:
+                out.write(line) # lines go out as soon as they are made, in whatever order they finish
+                made += 1
+            now = time.perf_counter()
+            if now - last >= 2:
+                out.flush()
+                if skipped:
+                    skipped.flush()
+                last = now
+                if not args.quiet:
+                    print("%d/%d puzzles, %.1f puzzles/s" % (made, len(todo), made / (now - start)), file=sys.stderr)
+    if skipped:
+        skipped.close()
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        print("made %d puzzles in %.1f s with %d workers, %.1f puzzles/s" % (made, elapsed, args.workers, made / elapsed if elapsed else 0.0), file=sys.stderr)
+        if index is not None:
+            print("dropped %d duplicates" % index.duplicates, file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
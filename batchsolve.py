@@ -0,0 +1,96 @@
+import os, sys, time, argparse, fileinput
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+"""
+solves puzzles in bulk, reads one puzzle per line from files or stdin and writes one result per line in the same order
+input lines start with an 81 character puzzle ("0" or "." for blanks), anything after it is ignored, so batchgen.py
+files can be solved as they are
+output lines:
+    <puzzle> <solution> <status>
+status is solved, multiple (the solution shown is one of several), unsolvable or invalid; the solution is 81 dots
+when there isn't one
+"""
+
+from solver import solve_unique
+
+NONE = "." * 81
+
+def solve_line(line):
+    # result line and status for one input line
+    text = line.split()[0] if line.strip() else ""
+    text = text.replace(".", "0")
+    if len(text) != 81 or not text.isdigit():
+        return "%s %s invalid\n" % (text or "-", NONE), "invalid"
+    sol, n = solve_unique([int(c) for c in text])
+    if sol is None:
+        status = "unsolvable"
+        return "%s %s %s\n" % (text, NONE, status), status
+    status = "solved" if n == 1 else "multiple"
+    return "%s %s %s\n" % (text, "".join(str(d) for row in sol for d in row), status), status
+
+def solve_chunk(lines):
+    # worker, solves a chunk of lines, returns (output text, statuses)
+    out = []
+    statuses = []
+    for line in lines:
+        text, status = solve_line(line)
+        out.append(text)
+        statuses.append(status)
+    return "".join(out), statuses
+
+def chunks(lines, size):
+    # splits the input into lists of size lines without reading ahead any further
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="solve puzzles from files or stdin, one per line, across a process pool")
+    parser.add_argument("files", nargs="*", help="input files, stdin if none or -")
+    parser.add_argument("--out", help="output file, stdout if not given")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 solves in this process")
+    parser.add_argument("--chunk", type=int, default=256, help="puzzles per task")
+    parser.add_argument("--window", type=int, default=0, help="most chunks in flight at once (default 4 per worker)")
+    args = parser.parse_args(argv)
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    counts = {"solved": 0, "multiple": 0, "unsolvable": 0, "invalid": 0}
+    start = time.perf_counter()
+
+    def write(result):
+        text, statuses = result
+        out.write(text)
+        for status in statuses:
+            counts[status] += 1
+
+    lines = fileinput.input(args.files or ["-"])
+    if args.workers == 0:
+        for chunk in chunks(lines, args.chunk):
+            write(solve_chunk(chunk))
+    else:
+        window = args.window or 4 * args.workers
+        with Pool(args.workers) as pool:
+            pending = deque() # chunks being solved, oldest first so results come out in input order
+            for chunk in chunks(lines, args.chunk):
+                if len(pending) >= window:
+                    write(pending.popleft().get()) # only read more input once the oldest chunk is done
+                pending.append(pool.apply_async(solve_chunk, (chunk,)))
+            while pending:
+                write(pending.popleft().get())
+    out.flush()
+    if args.out:
+        out.close()
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print("%d puzzles in %.2f s, %.1f puzzles/s (%s)" % (total, elapsed, total / elapsed if elapsed else 0.0,
+          ", ".join("%s %d" % (k, v) for k, v in counts.items())), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
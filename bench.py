@@ -0,0 +1,217 @@
+import os, sys, time, json, random, argparse, platform, subprocess
+
+"""
+benchmarks for the solver, the rating, the generator, 16x16 and 25x25 boards and one game frame, compared against a stored baseline
+python bench.py                   runs everything and compares with bench_baseline.json
+python bench.py --save-baseline   runs everything and stores the results as the new baseline
+"""
+
+from corpus import CORPORA, parse
+from solver import fast_solve
+from rating import rate
+import dlx
+from sudokuGen import make_puzzle, make_level, full_grid, IMPOSSIBLE
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DIFFICULTIES = (44, 50, 58, IMPOSSIBLE)
+
+def summary(times):
+    # ms statistics of a list of seconds, "ms" is the median and is what the baseline comparison uses
+    times = sorted(times)
+    n = len(times)
+    return {
+        "ms": 1000 * times[n // 2],
+        "mean_ms": 1000 * sum(times) / n,
+        "p90_ms": 1000 * times[min(n - 1, int(n * 0.9))],
+        "max_ms": 1000 * times[-1],
+        "n": n,
+    }
+
+def bench_solve(repeat):
+    # time to solve each puzzle of each corpus, every puzzle is solved repeat times
+    results = {}
+    for name, puzzles in CORPORA.items():
+        times = []
+        for line in puzzles:
+            grid = parse(line)
+            for r in range(repeat):
+                start = time.perf_counter()
+                fast_solve(grid)
+                times.append(time.perf_counter() - start)
+        results["solve/" + name] = summary(times)
+    return results
+
+def bench_rate(repeat):
+    # time to rate each puzzle of each corpus, the generator rates every board it makes
+    results = {}
+    for name, puzzles in CORPORA.items():
+        times = []
+        for line in puzzles:
+            grid = parse(line)
+            for r in range(repeat):
+                start = time.perf_counter()
+                rate(grid)
+                times.append(time.perf_counter() - start)
+        result = summary(times)
+        result["per_s"] = len(times) / sum(times)
+        results["rate/" + name] = result
+    return results
+
+def bench_generate(count, seed):
+    # time to make count unique boards per difficulty, seeded so every run makes the same boards
+    results = {}
+    for diff in DIFFICULTIES:
+        times = []
+        blanks = 0
+        for k in range(count):
+            start = time.perf_counter()
+            puzzle, sol, stats = make_level(diff, seed=seed*1000 + diff*100 + k)
+            times.append(time.perf_counter() - start)
+            blanks += stats["blanks"]
+        result = summary(times)
+        result["per_s"] = count / sum(times)
+        result["avg_blanks"] = blanks / count
+        results["generate/%d" % diff] = result
+
+    # solved grids alone, the start of every board
+    rng = random.Random(seed)
+    times = []
+    for k in range(count * 50):
+        start = time.perf_counter()
+        full_grid(rng)
+        times.append(time.perf_counter() - start)
+    result = summary(times)
+    result["per_s"] = len(times) / sum(times)
+    results["generate/full_grid"] = result
+    return results
+
+def bench_nxn(count, seed):
+    # 16x16 and 25x25 boards with the exact cover solver, at the blank counts the game uses
+    results = {}
+    for box, blanks in ((4, 140), (5, 281)):
+        name = "%dx%d" % (box * box, box * box)
+        made, times = [], []
+        for k in range(count if box == 4 else max(1, count // 4)):
+            start = time.perf_counter()
+            made.append(dlx.make_puzzle(box, blanks, seed=seed*1000 + k)[0])
+            times.append(time.perf_counter() - start)
+        result = summary(times)
+        result["per_s"] = len(times) / sum(times)
+        results["generate/" + name] = result
+        times = []
+        for puzzle in made:
+            start = time.perf_counter()
+            dlx.solve(puzzle, box)
+            times.append(time.perf_counter() - start)
+        results["solve/" + name] = summary(times)
+    return results
+
+def bench_frame(repeat):
+    # time of one game frame under SDL's dummy video driver: full repaint, a frame with a few changed tiles and an idle frame
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        import pygame
+        import mainMenu
+    except ImportError:
+        return {} # no pygame, nothing to measure
+    pygame.init()
+    win = pygame.display.set_mode((540, 600))
+    puzzle, sol, stats = make_puzzle(50, seed=1)
+    board = mainMenu.Grid(9, 9, 540, 540, win, puzzle, sol)
+    blanks = [i for i in range(81) if board.model.values[i] == 0]
+    full, dirty, idle = [], [], []
+    for r in range(repeat):
+        board.hud = None
+        start = time.perf_counter()
+        pygame.display.update(mainMenu.redraw_window(win, board, r, 0, 0))
+        full.append(time.perf_counter() - start)
+
+        i = blanks[r % len(blanks)]
+        board.select(i // 9, i % 9)
+        board.sketch(r % 9 + 1)
+        start = time.perf_counter()
+        pygame.display.update(mainMenu.redraw_window(win, board, r + 1, 0, 0))
+        dirty.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        pygame.display.update(mainMenu.redraw_window(win, board, r + 1, 0, 0))
+        idle.append(time.perf_counter() - start)
+    pygame.quit()
+    return {"frame/full": summary(full), "frame/dirty": summary(dirty), "frame/idle": summary(idle)}
+
+def bench_import(repeat):
+    # time for a fresh interpreter to import the headless core
+    times = []
+    for r in range(repeat):
+        out = subprocess.run([sys.executable, "-c", "import time; s = time.perf_counter(); import sudokuCore; print(time.perf_counter() - s)"],
+                             capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        times.append(float(out.stdout))
+    return {"import/sudokuCore": summary(times)}
+
+def compare(results, baseline, tolerance):
+    # prints each benchmark next to its baseline, returns the names that got slower by more than tolerance
+    slower = []
+    for name in sorted(results):
+        now = results[name]["ms"]
+        if name not in baseline:
+            print("%-20s %9.3f ms   (no baseline)" % (name, now))
+            continue
+        before = baseline[name]["ms"]
+        change = (now - before) / before if before else 0.0
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            slower.append(name)
+        print("%-20s %9.3f ms   baseline %9.3f ms   %+6.1f%%%s" % (name, now, before, 100 * change, flag))
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="solver, rating, generator and frame benchmarks")
+    parser.add_argument("--out", default="bench_results.json", help="where to write the results")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a benchmark counts as a regression")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--quick", action="store_true", help="fewer repeats, for a fast check")
+    parser.add_argument("--only", choices=["solve", "rate", "generate", "nxn", "frame", "import"], action="append", help="run only these groups")
+    args = parser.parse_args(argv)
+
+    groups = args.only or ["solve", "rate", "generate", "nxn", "frame", "import"]
+    repeat = 3 if args.quick else 10
+    results = {}
+    if "solve" in groups:
+        results.update(bench_solve(repeat))
+    if "rate" in groups:
+        results.update(bench_rate(repeat))
+    if "generate" in groups:
+        results.update(bench_generate(5 if args.quick else 20, args.seed))
+    if "nxn" in groups:
+        results.update(bench_nxn(4 if args.quick else 12, args.seed))
+    if "frame" in groups:
+        results.update(bench_frame(20 if args.quick else 100))
+    if "import" in groups:
+        results.update(bench_import(3 if args.quick else 10))
+
+    meta = {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"), "seed": args.seed, "quick": args.quick}
+    with open(args.out, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+        print("saved baseline to " + args.baseline)
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    slower = compare(results, baseline, args.tolerance)
+    if slower:
+        print("%d regression(s): %s" % (len(slower), ", ".join(slower)))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+from array import array
+from dlx import geometry
+
+"""
+compact board model used by mainMenu.py, every cell is one byte in a flat array indexed by row*size + col
+box is the width of a box, 3 for the classic 9x9 board, 4 for 16x16 and 5 for 25x25
+the candidates (pencil marks) of every cell are kept up to date on each placement, only the cell and its peers
+(the cells sharing its row, column or box) are touched, never the whole board
+"""
+
+_layout = {} # box -> (PEERS, UNITS)
+
+def layout(box):
+    # (PEERS, UNITS) for a box size, made once: the peers of every cell and the cells of every row, column and box
+    if box not in _layout:
+        ROW, COL, BOX = geometry(box)
+        n = len(ROW)
+        peers = [tuple(j for j in range(n) if j != i and (ROW[j] == ROW[i] or COL[j] == COL[i] or BOX[j] == BOX[i]))
+                 for i in range(n)]
+        units = ([("row", k + 1, [i for i in range(n) if ROW[i] == k]) for k in range(box*box)] +
+                 [("column", k + 1, [i for i in range(n) if COL[i] == k]) for k in range(box*box)] +
+                 [("box", k + 1, [i for i in range(n) if BOX[i] == k]) for k in range(box*box)])
+        _layout[box] = (peers, units)
+    return _layout[box]
+
+class Board:
+    # values, sketches and givens of the cells, the selected cell and the digits used in every row, column and box
+    __slots__ = ("values", "sketches", "givens", "dirty", "highlight", "selected", "rows", "cols", "boxes",
+                 "box", "size", "ROW", "COL", "BOX", "PEERS", "UNITS", "ALL", "cands", "marks")
+
+    def __init__(self, grid, box=3):
+        # constructor, grid is a size x size list or a flat sequence of size*size digits, 0 for blank
+        self.box = box
+        self.size = size = box * box
+        n = size * size
+        self.ROW, self.COL, self.BOX = geometry(box) # row, column and box of every cell
+        self.PEERS, self.UNITS = layout(box)
+        self.ALL = (1 << size) - 1 # every digit
+        flat = grid if len(grid) == n else [grid[i // size][i % size] for i in range(n)]
+        self.values = bytearray(flat) # digit in each cell
+        self.sketches = bytearray(n) # digit sketched by the player, shown until it is placed
+        self.givens = bytearray(1 if d else 0 for d in flat) # 1 for cells that came with the puzzle
+        self.dirty = bytearray(b"\x01" * n) # 1 for cells that have to be drawn again
+        self.highlight = bytearray(n) # 1 green, 2 red while the solver shows a cell
+        self.selected = -1 # index of the selected cell, -1 for none
+        # size bit masks of the digits in each row, column and box, bit d-1 is set when d is used
+        code = "H" if size <= 16 else "L"
+        self.rows = array(code, [0] * size)
+        self.cols = array(code, [0] * size)
+        self.boxes = array(code, [0] * size)
+        self.cands = array(code, [0] * n) # digits that still fit each empty cell, 0 for filled cells
+        self.marks = False # True while the candidates are shown, changed candidates then make their cell dirty
+        self.rebuild()
+
+    def rebuild(self):
+        # works out the row, column and box masks and all candidates from values, needed after values was changed directly
+        ROW, COL, BOX = self.ROW, self.COL, self.BOX
+        for k in range(self.size):
+            self.rows[k] = self.cols[k] = self.boxes[k] = 0
+        values = self.values
+        for i in range(len(values)):
+            if values[i]:
+                bit = 1 << (values[i] - 1)
+                self.rows[ROW[i]] |= bit
+                self.cols[COL[i]] |= bit
+                self.boxes[BOX[i]] |= bit
+        for i in range(len(values)):
+            self.cands[i] = 0 if values[i] else self.ALL & ~(self.rows[ROW[i]] | self.cols[COL[i]] | self.boxes[BOX[i]])
+        if self.marks:
+            self.dirty[:] = b"\x01" * len(values)
+
+    def set(self, i, val):
+        # sets a cell's value and keeps the masks in sync
+        old = self.values[i]
+        if old == val:
+            return
+        ROW, COL, BOX = self.ROW, self.COL, self.BOX
+        if old:
+            bit = ~(1 << (old - 1))
+            self.rows[ROW[i]] &= bit
+            self.cols[COL[i]] &= bit
+            self.boxes[BOX[i]] &= bit
+        if val:
+            bit = 1 << (val - 1)
+            self.rows[ROW[i]] |= bit
+            self.cols[COL[i]] |= bit
+            self.boxes[BOX[i]] |= bit
+        self.values[i] = val
+        self.dirty[i] = 1
+
+        # candidates, only cell i and its peers can change
+        cands = self.cands
+        if val and not old:
+            # the usual move, a digit goes into an empty cell and leaves the candidates of its peers
+            cands[i] = 0
+            keep = ~bit
+            if self.marks:
+                dirty = self.dirty
+                for p in self.PEERS[i]:
+                    if cands[p] & bit:
+                        cands[p] &= keep
+                        dirty[p] = 1
+            else:
+                for p in self.PEERS[i]:
+                    cands[p] &= keep
+            return
+        values = self.values
+        for p in (i,) + self.PEERS[i]: # a digit was taken out or swapped, peers may get it back
+            new = 0 if values[p] else self.ALL & ~(self.rows[ROW[p]] | self.cols[COL[p]] | self.boxes[BOX[p]])
+            if cands[p] != new:
+                cands[p] = new
+                if self.marks:
+                    self.dirty[p] = 1
+
+    def sketch(self, i, val):
+        # sets a cell's sketched value
+        if self.sketches[i] != val:
+            self.sketches[i] = val
+            self.dirty[i] = 1
+
+    def conflicts(self, i, val):
+        # True if val is already in the row, column or box of cell i
+        return bool((self.rows[self.ROW[i]] | self.cols[self.COL[i]] | self.boxes[self.BOX[i]]) & (1 << (val - 1)))
+
+    def show_marks(self, on):
+        # shows or hides the candidates of the empty cells
+        if self.marks != on:
+            self.marks = on
+            for i in range(len(self.values)):
+                if not self.values[i]:
+                    self.dirty[i] = 1
+
+    def hint(self):
+        # (cell, digit, explanation) of a cell that can be filled by logic alone, None if no single is left
+        # hidden singles come first, a digit with one place left in a row, column or box is what players spot first
+        cands = self.cands
+        size = self.size
+        for kind, k, unit in self.UNITS:
+            once = 0
+            twice = 0
+            for i in unit:
+                twice |= once & cands[i]
+                once |= cands[i]
+            hidden = once & ~twice
+            if hidden:
+                for i in unit:
+                    if cands[i] & hidden:
+                        bits = cands[i] & hidden
+                        d = (bits & -bits).bit_length() # lowest such digit, one is enough for a hint
+                        return i, d, "in %s %d, %d can only go in row %d, column %d" % (kind, k, d, i // size + 1, i % size + 1)
+        for i in range(len(cands)):
+            m = cands[i]
+            if m and not m & (m - 1):
+                d = m.bit_length()
+                return i, d, "row %d, column %d can only be %d, every other number is in its row, column or box" % (
+                    i // size + 1, i % size + 1, d)
+        return None
+
+    def select(self, i):
+        # selects cell i, only the old and new cell need drawing again
+        if self.selected >= 0:
+            self.dirty[self.selected] = 1
+        self.selected = i
+        self.dirty[i] = 1
+
+    def is_finished(self):
+        # checks if the board is finished
+        return 0 not in self.values
+
+    def grid(self):
+        # copy of the values as a size x size list
+        size = self.size
+        return [list(self.values[r*size:r*size + size]) for r in range(size)]
+
+class Cell:
+    # view of one cell of a Board, made once per cell so callers can still use board.cubes[i][j].value
+    __slots__ = ("board", "index")
+
+    def __init__(self, board, index):
+        # constructor
+        self.board = board
+        self.index = index
+
+    @property
+    def row(self):
+        return self.index // self.board.size
+
+    @property
+    def col(self):
+        return self.index % self.board.size
+
+    @property
+    def value(self):
+        return self.board.values[self.index]
+
+    @property
+    def temp(self):
+        return self.board.sketches[self.index]
+
+    @property
+    def selected(self):
+        return self.board.selected == self.index
+
+    def set(self, val):
+        # sets value
+        self.board.set(self.index, val)
+
+    def set_temp(self, val):
+        # sets temp value
+        self.board.sketch(self.index, val)
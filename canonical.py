@@ -0,0 +1,205 @@
+import sys, time, argparse
+from itertools import permutations
+from hashlib import blake2b
+from array import array
+
+"""
+canonical form of a puzzle and a dedup index that spots puzzles equal up to sudoku symmetry
+two puzzles are the same when one turns into the other by relabeling digits, swapping rows inside a band, bands,
+columns inside a stack, stacks, and transposing, 2 * 6^8 = 3,359,232 layouts times every relabeling
+canonical(grid)   the smallest 81 character string any layout gives, with digits renumbered in order of first
+                  appearance and blanks as 0; exact but slow, a pruned search that takes a few milliseconds for a
+                  generated puzzle and a tenth of a second or more for a solved grid (every column order ties on its
+                  first row), hundreds of puzzles a second, nowhere near fast enough to run on every puzzle
+invariant(grid)   a 64 bit key that no symmetry changes, about 40 microseconds a puzzle; different keys always mean
+                  different puzzles, equal keys may or may not be the same puzzle
+DedupIndex        keys puzzles by invariant, which is what keeps it at about 20,000 puzzles a second; canonical() only
+                  runs on a key collision, for both puzzles that share the key, which is rare
+python canonical.py bank.txt   counts duplicates in a batchgen file
+"""
+
+from solver import ROW, COL, BOX
+
+ORDERS = list(permutations(range(3))) # the 6 orders of 3 rows, columns, bands or stacks
+BAND = [ROW[i] // 3 * 10 for i in range(81)] # offsets into the counts of invariant()
+STACK = [30 + COL[i] // 3 * 10 for i in range(81)]
+
+def flat(grid):
+    # 81 digits from a 9x9 list, a flat sequence or an 81 character string
+    if isinstance(grid, str):
+        return [int(c) for c in grid.replace(".", "0")]
+    if len(grid) == 81:
+        return list(grid)
+    return [d for row in grid for d in row]
+
+def invariant(grid):
+    # 64 bit key of grid that is the same for every symmetric copy of it
+    # each given is described by things no symmetry changes: the clue counts of its row and column (as an unordered
+    # pair since transposing swaps them), of its box, how often its digit is given, and how often its digit is given
+    # in its band and in its stack (unordered too); the sorted list of those describes the puzzle
+    cells = flat(grid)
+    given = [i for i in range(81) if cells[i]]
+    rows = [0] * 9
+    cols = [0] * 9
+    boxes = [0] * 9
+    counts = [0] * 70 # digit d at 60 + d, in band k at k*10 + d, in stack k at 30 + k*10 + d
+    for i in given:
+        d = cells[i]
+        rows[ROW[i]] += 1
+        cols[COL[i]] += 1
+        boxes[BOX[i]] += 1
+        counts[60 + d] += 1
+        counts[BAND[i] + d] += 1
+        counts[STACK[i] + d] += 1
+    feats = []
+    for i in given:
+        d = cells[i]
+        a, b = rows[ROW[i]], cols[COL[i]]
+        e, f = counts[BAND[i] + d], counts[STACK[i] + d]
+        if a > b:
+            a, b = b, a
+        if e > f:
+            e, f = f, e
+        feats.append(a << 20 | b << 16 | boxes[BOX[i]] << 12 | counts[60 + d] << 8 | e << 4 | f)
+    feats.sort()
+    return int.from_bytes(blake2b(array("I", feats).tobytes(), digest_size=8).digest(), "little") # stable across runs, unlike hash()
+
+def first_row(row):
+    # column orders that make row smallest, with digits renumbered it is 0s and 1, 2, 3... so only where its blanks
+    # fall matters: stacks with fewer clues first and blanks first inside each stack
+    # returns (pattern, orders), pattern is the sorted clue count per stack and compares like the rows it stands for
+    counts = [sum(1 for c in range(s*3, s*3 + 3) if row[c]) for s in range(3)]
+    pattern = tuple(sorted(counts))
+    stack_orders = [o for o in ORDERS if counts[o[0]] <= counts[o[1]] <= counts[o[2]]]
+    inside = [] # per stack, the column orders with blanks first
+    for s in range(3):
+        cols = [s*3 + k for k in range(3)]
+        inside.append([tuple(cols[k] for k in o) for o in ORDERS
+                       if (row[cols[o[0]]] != 0) <= (row[cols[o[1]]] != 0) <= (row[cols[o[2]]] != 0)])
+    orders = []
+    for o in stack_orders:
+        for a in inside[o[0]]:
+            for b in inside[o[1]]:
+                for c in inside[o[2]]:
+                    orders.append(a + b + c)
+    return pattern, orders
+
+def canonical(grid):
+    # smallest string of grid over every symmetry, see the top of the file
+    # the layout is built one output row at a time and only layouts whose rows so far tie for smallest are kept;
+    # a state is (rows of the grid or its transpose, source rows used so far, column order, digit -> label)
+    cells = flat(grid)
+    sources = ([cells[r*9:r*9 + 9] for r in range(9)], [cells[c::9] for c in range(9)]) # as is and transposed
+
+    best = None
+    states = []
+    for t in range(2):
+        for r in range(9):
+            row = sources[t][r]
+            pattern, orders = first_row(row)
+            if best is not None and pattern > best:
+                continue
+            if best is None or pattern < best:
+                best = pattern
+                states = []
+            for order in orders:
+                labels = {}
+                for c in order:
+                    if row[c]:
+                        labels[row[c]] = len(labels) + 1
+                states.append((sources[t], (r,), order, labels))
+
+    for k in range(1, 9):
+        best = None
+        kept = []
+        for grid_rows, used, order, labels in states:
+            band = used[-1] // 3
+            if k % 3:
+                options = [band*3 + x for x in range(3) if band*3 + x not in used] # finish the band
+            else:
+                done = {u // 3 for u in used}
+                options = [b*3 + x for b in range(3) if b not in done for x in range(3)] # start a new band
+            for r in options:
+                row = grid_rows[r]
+                new = dict(labels)
+                out = []
+                for c in order:
+                    d = row[c]
+                    if d:
+                        if d not in new:
+                            new[d] = len(new) + 1
+                        out.append(new[d])
+                    else:
+                        out.append(0)
+                if best is not None and out > best:
+                    continue
+                if best is None or out < best:
+                    best = out
+                    kept = []
+                kept.append((grid_rows, used + (r,), order, new))
+        states = kept
+
+    grid_rows, used, order, labels = states[0]
+    return "".join(str(labels[grid_rows[r][c]]) if grid_rows[r][c] else "0" for r in used for c in order)
+
+class DedupIndex:
+    # set of puzzles up to symmetry, add() says whether a puzzle is new
+    def __init__(self):
+        # constructor
+        self.keys = {} # invariant -> puzzle as 81 bytes, or a list of [puzzle, canonical] once two share the key
+        self.added = 0
+        self.duplicates = 0
+        self.canonicalized = 0 # exact checks run, only when invariants collide
+
+    def canon(self, cells):
+        # canonical form, counted so callers can see how often the slow path ran
+        self.canonicalized += 1
+        return canonical(cells)
+
+    def add(self, grid):
+        # adds grid, returns False (and doesn't add it) if a symmetric copy is already in the index
+        cells = bytes(flat(grid))
+        key = invariant(cells)
+        entry = self.keys.get(key)
+        if entry is None:
+            self.keys[key] = cells # most puzzles stop here, no canonical form needed
+            self.added += 1
+            return True
+        if isinstance(entry, bytes):
+            entry = self.keys[key] = [[entry, None]]
+        mine = self.canon(cells)
+        for other in entry:
+            if other[1] is None:
+                other[1] = self.canon(other[0])
+            if other[1] == mine:
+                self.duplicates += 1
+                return False
+        entry.append([cells, mine])
+        self.added += 1
+        return True
+
+    def __len__(self):
+        return self.added
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="count puzzles that are the same up to symmetry in a batchgen file")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+    from batchgen import parse_line
+
+    index = DedupIndex()
+    start = time.perf_counter()
+    n = 0
+    with open(args.path) as f:
+        for line in f:
+            parsed = parse_line(line)
+            if parsed:
+                index.add(parsed[0])
+                n += 1
+    elapsed = time.perf_counter() - start
+    print("%d puzzles, %d distinct, %d duplicates, %d exact checks, %.0f puzzles/s" % (
+        n, len(index), index.duplicates, index.canonicalized, n / elapsed if elapsed else 0.0))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+fixed puzzle sets used by bench.py, 81 characters per puzzle, 0 for blank; every puzzle has exactly one solution
+"""
+
+# 44 blanks, made once by sudokuGen.make_puzzle and kept fixed
+EASY = [
+    "000957001507400900210008700070820400160049007008000010600000003953286170780030009",
+    "074010080506900017000740306250000001007200009008506234060800105709000600015002908",
+    "302050941108700250006401783000062075069100300500034609010000560090000102000000007",
+    "870600000000079006629314075050000293090000004403002007104296000502000061960100300",
+    "419370508020000379037000146040083691800012000000009200003005700065030900900020003",
+    "800721050010000009000049028529000806071508000348102000007980005900615000005037060",
+    "015490000090060107000710004068070020420600831109308706000000300800531070030200460",
+    "109706500080005394254008007500079410021300859003850000000400900002000005300087040",
+    "070500023400100006260470500034007090710050034800000600357002040692000000148090360",
+    "600040090940203000001600042200100007700504980590007204409080030063412579100000000",
+    "000010800000965002031020600003780904704259300900003026805600090300004210040072003",
+    "781400032005000000000080700902007400873004925514900300657290800030005090000800250",
+    "008050301600003040007294508139000870060000102002000003003460019701000005950078204",
+    "283459007009600000604028905007000059020097410015004602000302000002000001041905300",
+    "010504320005200010006010400700600081003720000000058273150046030030075106690030800",
+    "004603207308027040702009831500930080481000395093000712070000408000000000806400000",
+    "071904002029070040000025307000209008008600931067810004603001705790086000000000809",
+    "060038000009750032001002807620871900000304050000029000800017509050403010070205304",
+    "650100000100600004240700030086320059390005068705069000000036400960500200020970810",
+    "030400008051000060004600120679000005300907600420063709007054230042070801000201070",
+]
+
+# 17 clue puzzles, the fewest clues a unique sudoku can have, from Gordon Royle's collection
+SEVENTEEN = [
+    "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+    "000000010400000000020000000000050604008000300001090000300400200050100000000807000",
+    "000000012000035000000600070700000300000400800100000000000120000080000040050000600",
+    "000000012003600000000007000410020000000500300700000600280000040000300500000000000",
+    "000000012008030000000000040120500000000004700060000000507000300000620000000100000",
+    "000000012040050000000009000070600400000100000000000050000087500601000300200000000",
+    "000000012050400000000000030700600400001000000000080000920000800000510700000003000",
+    "000000012300000060000040000900000500000001070020000000000350400001400800060000000",
+    "000000012400090000000000050070200000600000400000108000018000000000030700502000000",
+    "000000012500008000000700000600120000700000450000030000030000800000500700020000000",
+]
+
+# puzzles known for being hard for people and for solvers
+HARDEST = [
+    "100007090030020008009600500005300900010080002600004000300000010040000007007000300", # AI Escargot
+    "000000012000000003002300400001800005060070800000009000008500000900040500470006000", # Platinum Blonde
+    "000000039000001005003050800008090006070002000100400000009080050020000600400700000", # Golden Nugget
+    "100000002090400050006000700050903000000070000000850040700000600030009080002000001", # Easter Monster
+    "400000805030000000000700000020000060000080400000010000000603070500200000104000000",
+    "520006000000000701300000000000400800600000050000000000041800000000030020008700000",
+    "600000803040700000000000000000504070300200000106000000020000050000080600000010000",
+    "480300000000000071020000000705000060000200800000000000001076000300000400000050000",
+    "000014000030000200070000000000900030601000000000000080200000104000050600000708000",
+]
+
+CORPORA = {"easy": EASY, "17-clue": SEVENTEEN, "hardest": HARDEST}
+
+def parse(line):
+    # 81 character puzzle string to a 9x9 list, "." and "0" are blanks
+    line = line.strip().replace(".", "0")
+    return [[int(line[r*9 + c]) for c in range(9)] for r in range(9)]
@@ -0,0 +1,269 @@
+import random, time
+import instrument
+
+"""
+exact cover solver and generator for sudoku of any box size (box 3 is the classic 9x9, 4 is 16x16, 5 is 25x25)
+a board of box b has size n = b*b symbols and n*n cells, kept as a flat list indexed by row*n + col, 0 for blank
+as exact cover every (cell, symbol) choice is a row that fills four columns:
+    the cell, the symbol in the cell's row, the symbol in its column and the symbol in its box
+and a solution is a set of rows that fills every column exactly once
+the search is Knuth's Algorithm X on dancing links: the matrix is a grid of doubly linked nodes held in flat int lists,
+covering a column unlinks it and every row that uses it, uncovering relinks them in reverse, so backtracking costs
+nothing but the links it touches; it always branches on the column with the fewest rows left
+"""
+
+_geometry = {} # box -> (ROW, COL, BOX)
+
+def geometry(box):
+    # (ROW, COL, BOX) lists giving the row, column and box of every flat cell index, made once per box size
+    if box not in _geometry:
+        n = box * box
+        _geometry[box] = ([i // n for i in range(n*n)],
+                          [i % n for i in range(n*n)],
+                          [(i // n // box) * box + (i % n) // box for i in range(n*n)])
+    return _geometry[box]
+
+def cover(c, L, R, U, D, C, S):
+    # takes column c out of the header ring and every row using c out of the other columns
+    L[R[c]] = L[c]
+    R[L[c]] = R[c]
+    i = D[c]
+    while i != c:
+        j = R[i]
+        while j != i:
+            U[D[j]] = U[j]
+            D[U[j]] = D[j]
+            S[C[j]] -= 1
+            j = R[j]
+        i = D[i]
+
+def uncover(c, L, R, U, D, C, S):
+    # exact reverse of cover
+    i = U[c]
+    while i != c:
+        j = L[i]
+        while j != i:
+            S[C[j]] += 1
+            U[D[j]] = j
+            D[U[j]] = j
+            j = L[j]
+        i = U[i]
+    L[R[c]] = c
+    R[L[c]] = c
+
+def load(grid, box, exclude=-1):
+    # dancing links for the open part of grid as (L, R, U, D, C, S, choices), None if two givens clash
+    # only columns the givens leave open and (cell, symbol) rows that don't clash with a given are linked, which is
+    # much less work than linking the whole 4n^3 node matrix and covering every given
+    # node 0 is the root, then the column headers, then four nodes per row, choices[k] = cell*n + symbol-1 of row k
+    # exclude is a cell*n + symbol-1 choice to leave out, used to look for a second solution
+    n = box * box
+    ROW, COL, BOX = geometry(box)
+    rows = [0] * n # symbols used in each row, column and box, bit s-1 for symbol s
+    cols = [0] * n
+    boxes = [0] * n
+    for i in range(n * n):
+        s = grid[i]
+        if s:
+            bit = 1 << (s - 1)
+            if (rows[ROW[i]] | cols[COL[i]] | boxes[BOX[i]]) & bit:
+                return None # same symbol twice in a unit
+            rows[ROW[i]] |= bit
+            cols[COL[i]] |= bit
+            boxes[BOX[i]] |= bit
+
+    ids = [0] * (4*n*n) # constraint -> column header, 0 when a given already fills it
+    k = 0
+    for i in range(n * n):
+        if not grid[i]:
+            k += 1
+            ids[i] = k
+    for part, used in ((1, rows), (2, cols), (3, boxes)):
+        for u in range(n):
+            for s in range(n):
+                if not used[u] >> s & 1:
+                    k += 1
+                    ids[part*n*n + u*n + s] = k
+
+    L = list(range(-1, k)) # headers linked in a ring through the root
+    R = list(range(1, k + 2))
+    L[0] = k
+    R[k] = 0
+    U = list(range(k + 1))
+    D = list(range(k + 1))
+    C = list(range(k + 1))
+    S = [0] * (k + 1)
+    choices = []
+    for i in range(n * n):
+        if grid[i]:
+            continue
+        r, c, b = ROW[i], COL[i], BOX[i]
+        used = rows[r] | cols[c] | boxes[b]
+        for s in range(n):
+            if used >> s & 1 or i*n + s == exclude:
+                continue
+            choices.append(i*n + s)
+            start = len(C)
+            for h in (ids[i], ids[n*n + r*n + s], ids[2*n*n + c*n + s], ids[3*n*n + b*n + s]):
+                node = len(C)
+                C.append(h)
+                U.append(U[h]) # append at the bottom of column h
+                D.append(h)
+                D[U[h]] = node
+                U[h] = node
+                S[h] += 1
+                L.append(node - 1)
+                R.append(node + 1)
+            L[start] = start + 3 # close the row into a ring of four
+            R[start + 3] = start
+    return L, R, U, D, C, S, choices
+
+def search(links, limit, rng=None, sink=None):
+    # Algorithm X without recursion, returns (number of solutions up to limit, row nodes of the first, nodes visited)
+    # rng shuffles the order rows are tried in, used to make random full grids
+    # if sink is a list the row nodes of every solution are appended to it
+    L, R, U, D, C, S, choices = links
+    chosen = [] # row node picked at each level
+    options = [] # rows left to try at each level, only used with rng
+    found = 0
+    first = None
+    nodes = 0
+    while True:
+        if R[0] == 0: # every column is filled, a solution
+            found += 1
+            if first is None:
+                first = list(chosen)
+            if sink is not None:
+                sink.append(list(chosen))
+            if found >= limit:
+                break
+            c = 0 # backtrack
+        else:
+            # column with the fewest rows, stops early at 0 or 1
+            c = R[0]
+            best = S[c]
+            j = R[c]
+            while j and best > 1:
+                if S[j] < best:
+                    c, best = j, S[j]
+                j = R[j]
+            if best == 0:
+                c = 0 # dead end, backtrack
+        if c:
+            cover(c, L, R, U, D, C, S)
+            if rng is None:
+                r = D[c]
+            else:
+                rows = []
+                r = D[c]
+                while r != c:
+                    rows.append(r)
+                    r = D[r]
+                rng.shuffle(rows)
+                r = rows.pop()
+                options.append(rows)
+            chosen.append(r)
+            nodes += 1
+            j = R[r]
+            while j != r:
+                cover(C[j], L, R, U, D, C, S)
+                j = R[j]
+            continue
+        # backtrack to the deepest level that has another row to try
+        while chosen:
+            r = chosen.pop()
+            j = L[r]
+            while j != r:
+                uncover(C[j], L, R, U, D, C, S)
+                j = L[j]
+            c = C[r]
+            if rng is None:
+                r = D[r]
+            else:
+                rows = options[-1]
+                r = rows.pop() if rows else c
+                if r == c:
+                    options.pop()
+            if r != c:
+                chosen.append(r)
+                nodes += 1
+                j = R[r]
+                while j != r:
+                    cover(C[j], L, R, U, D, C, S)
+                    j = R[j]
+                break
+            uncover(c, L, R, U, D, C, S)
+        else:
+            break # search space exhausted
+    if instrument.ENABLED:
+        instrument.count("dlx.searches")
+        instrument.count("dlx.nodes", nodes)
+    return found, first, nodes
+
+def rows_to_grid(grid, links, rows, box):
+    # flat solved board from the givens of grid and the row nodes chosen by search
+    n = box * box
+    L, R, U, D, C, S, choices = links
+    base = len(S) # first row node, right after the headers
+    out = list(grid)
+    for r in rows:
+        choice = choices[(r - base) // 4] # any node of a row, rows are four nodes each
+        out[choice // n] = choice % n + 1
+    return out
+
+def solve(grid, box, rng=None):
+    # solved copy of a flat grid or None if it has no solution, grid is never modified
+    links = load(grid, box)
+    if links is None:
+        return None
+    found, rows, nodes = search(links, 1, rng)
+    if not found:
+        return None
+    return rows_to_grid(grid, links, rows, box)
+
+def count_solutions(grid, box, limit=2):
+    # number of solutions of a flat grid, capped at limit
+    links = load(grid, box)
+    if links is None:
+        return 0
+    return search(links, limit)[0]
+
+def full_grid(box, rng=random):
+    # random solved flat grid, a search of the empty board shuffled on top like sudokuGen.full_grid
+    n = box * box
+    base = solve([0] * (n*n), box, rng)
+    rows = [band*box + r for band in rng.sample(range(box), box) for r in rng.sample(range(box), box)]
+    cols = [stack*box + c for stack in rng.sample(range(box), box) for c in rng.sample(range(box), box)]
+    symbols = [0] + rng.sample(range(1, n + 1), n)
+    grid = [symbols[base[r*n + c]] for r in rows for c in cols]
+    if rng.random() < 0.5:
+        grid = [grid[c*n + r] for r in range(n) for c in range(n)] # transpose
+    return grid
+
+def make_puzzle(box, blanks, budget=None, seed=None):
+    # flat board with up to blanks blanks and exactly one solution, returns (puzzle, solution, stats) like sudokuGen
+    # clues are taken out in random order and put back when the board stops being unique
+    start = time.perf_counter()
+    rng = random if seed is None else random.Random(seed)
+    n = box * box
+    sol = full_grid(box, rng)
+    puzzle = list(sol)
+    removed = 0
+    checks = 0
+    nodes = 0
+    for i in rng.sample(range(n*n), n*n):
+        if removed == blanks or (budget is not None and time.perf_counter() - start > budget):
+            break
+        puzzle[i] = 0
+        # the board is still unique if no solution puts anything but sol[i] in cell i
+        found, rows, visited = search(load(puzzle, box, i*n + sol[i] - 1), 1)
+        checks += 1
+        nodes += visited
+        if not found:
+            removed += 1
+        else:
+            puzzle[i] = sol[i]
+    stats = {"blanks": removed, "requested": blanks, "checks": checks, "nodes": nodes, "seconds": time.perf_counter() - start}
+    if instrument.ENABLED:
+        instrument.generated(stats, "generate.%dx%d" % (n, n))
+    return puzzle, sol, stats
@@ -0,0 +1,53 @@
+import pygame, time
+from collections import deque
+import instrument
+
+"""
+frame pacing for the scene loop in mainMenu.py, caps the frame rate while something moves and sleeps on events otherwise
+"""
+
+TICK = pygame.USEREVENT + 1 # posted once a second by games so an idle window still updates its timer
+
+class FrameScheduler:
+    # waits for the next frame and keeps frame time and idle statistics
+    def __init__(self, fps=60):
+        # constructor, fps is the most frames per second drawn while animating
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.times = deque(maxlen=1000) # seconds of work in each of the last frames
+        self.frames = 0
+        self.busy = 0.0 # seconds spent handling events and drawing
+        self.idle = 0.0 # seconds spent waiting
+        self.mark = time.perf_counter() # end of the last wait
+
+    def wait(self, animating):
+        # blocks until the next frame is due and returns its events
+        # while animating frames come at most fps times a second, otherwise nothing happens until an event arrives
+        start = time.perf_counter()
+        work = start - self.mark
+        self.times.append(work)
+        self.busy += work
+        self.frames += 1
+        if instrument.ENABLED:
+            instrument.observe("frame", work)
+        if animating:
+            self.clock.tick(self.fps) # sleeps off the rest of the frame
+            events = pygame.event.get()
+        else:
+            events = [pygame.event.wait()] + pygame.event.get()
+            self.clock.tick() # restarts the clock so the next animated frame isn't held back
+        self.mark = time.perf_counter()
+        self.idle += self.mark - start
+        return events
+
+    def stats(self):
+        # frame count, average, 95th percentile and worst frame time in ms, and how much of the time was spent idle
+        times = sorted(self.times)
+        total = self.busy + self.idle
+        return {
+            "frames": self.frames,
+            "avg_ms": 1000 * sum(times) / len(times) if times else 0.0,
+            "p95_ms": 1000 * times[int(len(times) * 0.95)] if times else 0.0,
+            "max_ms": 1000 * times[-1] if times else 0.0,
+            "idle_pct": 100 * self.idle / total if total else 0.0,
+        }
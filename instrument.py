@@ -0,0 +1,156 @@
+import os, sys, time, atexit
+from bisect import bisect_left
+
+"""
+opt-in counters and timing histograms for the solver, the generator and the game loop, written as JSON on exit
+switched on before anything is imported, by environment variable or by the matching sudoku.py flag:
+    SUDOKU_INSTRUMENT=stats.json   (--instrument)   counters and histograms
+    SUDOKU_PROFILE=session.pstats  (--profile)      a cProfile capture of the main thread, read it with pstats
+when off, timed() and nodes() hand back the function they were given, so the hot paths run exactly the code they run
+without this module; the few hooks that stay in place (one per frame and one per generated board) test ENABLED first
+what is recorded:
+    solver.search, solver.count   nodes visited and backtracks (nodes that came back without a solution)
+    dlx                           searches and nodes of the exact cover solver
+    generate, generate.NxN        boards made, attempts, uniqueness checks and a histogram of seconds per board
+    place, draw, frame, ...       histograms of how long each call took
+only this process is counted: boards made by the prefetch worker are recorded from the stats they come back with,
+batchgen.py and solutions.py workers aren't recorded at all
+"""
+
+PATH = os.environ.get("SUDOKU_INSTRUMENT")
+PROFILE_PATH = os.environ.get("SUDOKU_PROFILE")
+ENABLED = bool(PATH)
+
+BOUNDS_MS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000) # bucket upper edges
+
+counters = {} # name -> count
+timings = {} # name -> Histogram
+started = time.time()
+
+class Histogram:
+    # call durations bucketed on a log scale, so it takes the same memory however long a session runs
+    __slots__ = ("buckets", "n", "total", "worst")
+
+    def __init__(self):
+        # constructor
+        self.buckets = [0] * (len(BOUNDS_MS) + 1) # the last one is everything slower than the last edge
+        self.n = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds):
+        # records one duration
+        ms = seconds * 1000
+        self.buckets[bisect_left(BOUNDS_MS, ms)] += 1
+        self.n += 1
+        self.total += ms
+        if ms > self.worst:
+            self.worst = ms
+
+    def percentile(self, p):
+        # upper edge in ms of the bucket that holds the p-th percentile, never more than the worst time seen
+        rank = p * self.n / 100
+        seen = 0
+        for k, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(BOUNDS_MS[k], self.worst) if k < len(BOUNDS_MS) else self.worst
+        return 0.0
+
+    def summary(self):
+        # dict for the JSON dump, only buckets that were used are listed, keyed by their upper edge
+        buckets = {}
+        for k, n in enumerate(self.buckets):
+            if n:
+                buckets["<=%g" % BOUNDS_MS[k] if k < len(BOUNDS_MS) else ">%g" % BOUNDS_MS[-1]] = n
+        return {"count": self.n, "total_ms": round(self.total, 3), "avg_ms": round(self.total / self.n, 4) if self.n else 0.0,
+                "p50_ms": self.percentile(50), "p95_ms": self.percentile(95), "p99_ms": self.percentile(99),
+                "max_ms": round(self.worst, 3), "buckets_ms": buckets}
+
+def count(name, n=1):
+    # adds n to a counter
+    counters[name] = counters.get(name, 0) + n
+
+def observe(name, seconds):
+    # adds one duration to the histogram of name
+    h = timings.get(name)
+    if h is None:
+        h = timings[name] = Histogram()
+    h.add(seconds)
+
+def timed(name):
+    # decorator that records how long every call takes, does nothing when instrumentation is off
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+        def timed_call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        timed_call.__name__ = fn.__name__
+        timed_call.__doc__ = fn.__doc__
+        return timed_call
+    return wrap
+
+def nodes(name):
+    # decorator for a recursive search, counts every call as a node and every call that comes back empty (None or 0)
+    # as a backtrack; the recursion goes through the module global so each level passes through the wrapper
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+        visited, dead = name + ".nodes", name + ".backtracks"
+        def counted(*args, **kwargs):
+            counters[visited] = counters.get(visited, 0) + 1
+            result = fn(*args, **kwargs)
+            if not result:
+                counters[dead] = counters.get(dead, 0) + 1
+            return result
+        counted.__name__ = fn.__name__
+        counted.__doc__ = fn.__doc__
+        return counted
+    return wrap
+
+def generated(stats, name="generate"):
+    # records one generated board from the stats dict make_puzzle returns
+    count(name + ".boards")
+    count(name + ".attempts", stats.get("attempts", 1))
+    count(name + ".checks", stats.get("checks", 0))
+    observe(name, stats["seconds"])
+
+def report():
+    # everything recorded so far as a dict
+    return {"seconds": round(time.time() - started, 3), "argv": sys.argv, "pid": os.getpid(),
+            "counters": dict(sorted(counters.items())),
+            "timings": {name: timings[name].summary() for name in sorted(timings)}}
+
+def dump(path=None):
+    # writes the report as JSON to path (default $SUDOKU_INSTRUMENT)
+    import json
+    with open(path or PATH, "w") as f:
+        json.dump(report(), f, indent=2)
+        f.write("\n")
+
+def finish():
+    # exit handler, writes the report and the profile
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(PROFILE_PATH)
+        print("profile written to %s" % PROFILE_PATH, file=sys.stderr)
+    if ENABLED:
+        dump()
+        print("instrumentation written to %s" % PATH, file=sys.stderr)
+
+profiler = None
+if PATH or PROFILE_PATH:
+    # worker processes inherit the environment, only the process that switched it on writes the files
+    owner = os.environ.setdefault("SUDOKU_INSTRUMENT_PID", str(os.getpid()))
+    if owner == str(os.getpid()):
+        if PROFILE_PATH:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        atexit.register(finish)
+    else:
+        ENABLED = False # counts made here would be lost with the worker anyway
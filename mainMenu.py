@@ -2,82 +2,166 @@ import pygame, random, time
 from random import sample
 from copy import deepcopy
 from sudokuGen import * # contains functions used to create and solve boards that will be given to the user 
+from sudokuCore import valid, find_empty # board checks that don't need pygame
+from solver import fast_solve, solve_steps # bitmask solver
+from board import Board, Cell # compact board model
+from render import glyphs # pre-rendered digits
+from prefetch import Prefetcher, BIG # boards made ahead of time
+from puzzleBank import PuzzleBank # pre-built boards on disk
+from frames import FrameScheduler, TICK # frame pacing
+import dlx # exact cover solver and generator for 16x16 and 25x25
+import instrument # timings, off unless switched on, see instrument.py
+
+puzzles = None # Prefetcher started by main(), keeps boards ready for each difficulty
+bank = None # PuzzleBank opened by main() if there is one, used before the prefetcher
 
 class Grid:
     # creates the grid Sudoku is played on
-    def __init__(self, rows, cols, width, height, win, board):
+    def __init__(self, rows, cols, width, height, win, board, solution=None):
         # constructor
         self.rows = rows
         self.cols = cols # rows and cols for board
-        self.cubes = [[Cube(board[i][j], i, j, width, height) for j in range(cols)] for i in range(rows)]
+        self.box = int(round(rows ** 0.5)) # tiles across a box, 3 on the classic board
+        self.model = Board(board, self.box) # values, sketches and selection in flat arrays, see board.py
+        self.cubes = [[Cell(self.model, i*cols + j) for j in range(cols)] for i in range(rows)] # views into the model
         self.width = width
         self.height = height # width and height of board
-        self.model = None # updates the board
-        self.update_model() # updates the board
-        self.selected = None # which tile is selected
         self.win = win # pygame window
+        self.hud = None # counters, timer and button as last drawn by redraw_window, None forces a full repaint
+        if solution is None: # solved once when the board is created instead of on every placement
+            solution = fast_solve(self.model.values) if self.box == 3 else dlx.solve(self.model.values, self.box)
+        if solution is not None and len(solution) == rows:
+            solution = [d for row in solution for d in row]
+        self.solution = None if solution is None else bytes(solution) # flat like the model
+
+    @property
+    def selected(self):
+        # (row, col) of the selected tile or None
+        i = self.model.selected
+        if i < 0:
+            return None
+        return (i // self.cols, i % self.cols)
+
+    def set_value(self, row, col, val):
+        # sets a tile's value, the model keeps its row, column and box masks in sync
+        self.model.set(row*self.cols + col, val)
 
-    def update_model(self):
-        # updates the board
-        self.model = [[self.cubes[i][j].value for j in range(self.cols)] for i in range(self.rows)]
+    def conflicts(self, val, row, col):
+        # True if val is already in the row, column or box of (row, col)
+        return self.model.conflicts(row*self.cols + col, val)
 
+    @instrument.timed("place")
     def place(self, val):
         # places a number on an empty tile if number is correct
-        row, col = self.selected
-        if self.cubes[row][col].value == 0:
-            self.cubes[row][col].set(val)
-            self.update_model()
-
-            if valid(self.model, val, (row,col)) and self.solve():
-                # checks if the placement is a valid tile
-                return True
-            else:
+        i = self.model.selected
+        if self.model.values[i] == 0:
+            # checks if the placement is a valid tile, against the solution worked out once when the board was made
+            if self.model.conflicts(i, val) or (self.solution is not None and self.solution[i] != val):
                 # if it's not valid, leave the space blank
-                self.cubes[row][col].set(0)
-                self.cubes[row][col].set_temp(0)
-                self.update_model()
+                self.model.sketch(i, 0)
                 return False
+            self.model.set(i, val) # stores the value and updates the masks and candidates
+            return True
 
     def sketch(self, val):
         # gives values and selects tile
-        row, col = self.selected
-        self.cubes[row][col].set_temp(val)
+        self.model.sketch(self.model.selected, val)
 
-    def draw(self):
+    def draw_lines(self):
         # draws grid lines
-        gap = self.width / 9
+        gap = self.width / self.cols
         for i in range(self.rows+1):
-            if i % 3 == 0 and i != 0:
-                thick = 4 # creates the thick lines that divides the board into nine sections
+            if i % self.box == 0 and i != 0:
+                thick = 4 # creates the thick lines that divides the board into boxes
             else:
                 thick = 1 # creates the thin lines between each tile
             pygame.draw.line(self.win, (0,0,0), (0, i*gap), (self.width, i*gap), thick)
             pygame.draw.line(self.win, (0, 0, 0), (i * gap, 0), (i * gap, self.height), thick)
 
-        # draws cubes
-        for i in range(self.rows):
-            for j in range(self.cols):
-                self.cubes[i][j].draw(self.win)
+    def draw_cell(self, i):
+        # draws the number on tile i
+        model = self.model
+        gap = self.width / self.cols
+        glyph = glyphs(gap, self.cols) # numbers are rendered once per session
+        x = (i % self.cols) * gap
+        y = (i // self.cols) * gap
+
+        if model.highlight[i]:
+            # pre-rendered white tile with the digit, green outline if correct and red outline if incorrect
+            self.win.blit(glyph.solver[model.highlight[i] == 1][model.values[i]], (x, y))
+            return
+
+        if model.sketches[i] != 0 and model.values[i] == 0:  # if tile is blank
+            self.win.blit(glyph.sketch[model.sketches[i]], (x + gap/12, y + gap/12))
+        elif model.marks and model.values[i] == 0:
+            # candidates, digit d in the spot d-1 of a box x box grid inside the tile
+            m = model.cands[i]
+            step = gap / self.box
+            d = 1
+            while m:
+                if m & 1:
+                    text = glyph.mark[d]
+                    k = d - 1
+                    self.win.blit(text, (x + (k % self.box + 0.5) * step - text.get_width()/2,
+                                         y + (k // self.box + 0.5) * step - text.get_height()/2))
+                m >>= 1
+                d += 1
+        elif model.values[i] != 0:
+            text = glyph.given[model.values[i]] # if tile is not blank don't change it
+            self.win.blit(text, (x + (gap/2 - text.get_width()/2), y + (gap/2 - text.get_height()/2)))
+        if model.selected == i:
+            pygame.draw.rect(self.win, (230,122,0), (x,y, gap ,gap), 3)  # creates orange outline on selected tile
+
+    def cell_rect(self, i):
+        # area of the window tile i covers
+        gap = self.width / self.cols
+        x = int((i % self.cols) * gap)
+        y = int((i // self.cols) * gap)
+        return pygame.Rect(x, y, int((i % self.cols + 1) * gap) - x, int((i // self.cols + 1) * gap) - y)
+
+    @instrument.timed("draw")
+    def draw(self, full=False):
+        # draws the board, only tiles that changed unless full is True, returns the rects that were drawn
+        dirty = self.model.dirty
+        if not full and dirty.count(1) > 20:
+            full = True # past this many tiles one repaint of the board is cheaper than clipping each tile
+            self.win.fill((255,255,255), (0, 0, self.width, self.height))
+        if full:
+            self.draw_lines()
+            for i in range(self.rows * self.cols):
+                self.draw_cell(i)
+            dirty[:] = CLEAN if len(dirty) == 81 else bytes(len(dirty))
+            return [pygame.Rect(0, 0, self.width, self.height)]
+
+        rects = []
+        i = dirty.find(1)
+        while i >= 0:
+            # repaint just this tile, clipping keeps the grid lines from spilling onto its neighbours
+            rect = self.cell_rect(i)
+            self.win.set_clip(rect)
+            self.win.fill((255,255,255), rect)
+            self.draw_lines()
+            self.draw_cell(i)
+            self.win.set_clip(None)
+            dirty[i] = 0
+            rects.append(rect)
+            i = dirty.find(1, i + 1)
+        return rects
 
     def select(self, row, col):
-        # selects a tile
-        for i in range(self.rows):
-            for j in range(self.cols):
-                self.cubes[i][j].selected = False # sets all tiles to not selected
-
-        self.cubes[row][col].selected = True # set the tile passed by params to .selected = True, meaning it is the only tile selected
-        self.selected = (row, col) # updates .selected with (x,y)
+        # selects a tile, the model only keeps one selected index
+        self.model.select(row*self.cols + col)
 
     def clear(self):
         # deletes input if user doesn't press return
-        row, col = self.selected
-        if self.cubes[row][col].value == 0:
-            self.cubes[row][col].set_temp(0)
+        i = self.model.selected
+        if self.model.values[i] == 0:
+            self.model.sketch(i, 0)
 
     def click(self, pos):
         # checks that the mouse is in the window then returns the (x,y) coordinates of wherever the mouse is
         if pos[0] < self.width and pos[1] < self.height:
-            gap = self.width / 9
+            gap = self.width / self.cols
             x = pos[0] // gap
             y = pos[1] // gap
             return (int(y),int(x))
@@ -86,167 +170,154 @@ class Grid:
 
     def is_finished(self):
         # checks if the board is finished
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if self.cubes[i][j].value == 0:
-                    return False # if any tile is blank then it's not solved
-        return True
+        return self.model.is_finished()
 
     def solve(self):
-        # recursive backtracking algorithm used by placement function
-        find = find_empty(self.model)
-        if not find: # if it cannot find a blank space then the board must be solved
-            return True # board is solved
-        else:
-            row, col = find # find is (x,y)
-
-        for i in range(1, 10):
-            if valid(self.model, i, (row, col)): # iterates through board and attemps to place i 
-                self.model[row][col] = i
+        # fills the board with its solution, returns False if it has none
+        if self.solution is None:
+            return False # board has no solution
+        for i in range(self.rows * self.cols):
+            self.model.set(i, self.solution[i])
+        return True
 
-                if self.solve(): # starts recursion, will return True when there are no more spaces to find
-                    return True # ends recursion, solve will only return True when it cannot find an blank space
-        
-                self.model[row][col] = 0 # i is valid but solve is False, set to 0
+    def solveGUI(self, speed=1):
+        # starts the animated solver, the game loop calls .run() on what this returns every frame
+        return SolverAnimation(self, speed)
 
-        return False # if no valid spots, return False
+def fill_steps(cells, solution):
+    # steps for boards bigger than 9x9, where watching a search would take too long, fills the blanks one by one
+    if solution is None:
+        return
+    for i in range(len(cells)):
+        if cells[i] == 0:
+            cells[i] = solution[i]
+            yield i
 
-    def solveGUI(self):
-        # recursive backtracking algorithm used for GUI
-        self.update_model() # updates model
-        find = find_empty(self.model) 
-        if not find: # if it cannot find a blank space then the board must be solved
-            return True # board is solved
-        else:
-            row, col = find # find is (x,y)
-
-        for i in range(1, 10): 
-            if valid(self.model, i, (row, col)): # iterates through board and attemps to place i 
-                self.model[row][col] = i 
-                self.cubes[row][col].set(i)
-                self.cubes[row][col].draw_change(self.win, True)
-                self.update_model()
-                pygame.display.update()
-                pygame.time.delay(20) # speed displayed solving
-
-                if self.solveGUI(): # starts recursion, will return True when there are no more spaces to find
-                    return True # ends recursion, solveGUI will only return True when it cannot find an blank space
-
-                self.model[row][col] = 0 # i is valid but solve is False, set to 0
-                self.cubes[row][col].set(0)
-                self.update_model()
-                self.cubes[row][col].draw_change(self.win, False)
-                pygame.display.update() # updates frames
-                pygame.time.delay(20) # speed displayed solving
-
-        return False # if no valid spots, return False
-
-class Cube:
-    # each tile on the board
-    rows = 9
-    cols = 9
-
-    def __init__(self, value, row, col, width, height):
-        #  constructor
-        self.value = value # tile's value
-        self.temp = 0 # temporary tile value
-        self.row = row
-        self.col = col
-        self.width = width
-        self.height = height  # row, col, width, height of the board
-        self.selected = False # if tile is selected
-
-    def draw(self, win):
-        # draws the number on the tile
-        fnt = pygame.font.SysFont("comicsans", 40) # font for text
-        gap = self.width / 9
-        x = self.col * gap
-        y = self.row * gap
-
-        if self.temp != 0 and self.value == 0:  # if tile is blank
-            text = fnt.render(str(self.temp), 1, (128,128,128))
-            win.blit(text, (x+5, y+5))
-        elif not(self.value == 0):
-            text = fnt.render(str(self.value), 1, (0, 0, 0)) # if tile is not blank don't change it
-            win.blit(text, (x + (gap/2 - text.get_width()/2), y + (gap/2 - text.get_height()/2)))
-        if self.selected:
-            pygame.draw.rect(win, (230,122,0), (x,y, gap ,gap), 3)  # creates orange outline on selected tile
-
-    def draw_change(self, win, g=True):
-        # draws changes on the board when recursive algorithm is running
-        fnt = pygame.font.SysFont("comicsans", 40) # font for text
-        gap = self.width / 9
-        x = self.col * gap
-        y = self.row * gap
-        pygame.draw.rect(win, (255, 255, 255), (x, y, gap, gap), 0) # originally makes background white
-        text = fnt.render(str(self.value), 1, (0, 0, 0)) 
-        win.blit(text, (x + (gap / 2 - text.get_width() / 2), y + (gap / 2 - text.get_height() / 2)))
-        if g:
-            pygame.draw.rect(win, (0, 255, 0), (x, y, gap, gap), 3) # green outline if correct
-        else:
-            pygame.draw.rect(win, (255, 0, 0), (x, y, gap, gap), 3) # red outline if incorrect
-
-    def set(self, val):
-        # sets value
-        self.value = val
-
-    def set_temp(self, val):
-        # sets temp value
-        self.temp = val
-
-def find_empty(bo):
-    # iterates through board and returns (x,y) of first blank space
-    for i in range(len(bo)):
-        for j in range(len(bo[0])):
-            if bo[i][j] == 0:
-                return (i, j)  # row, col
-
-    return None
-
-def valid(bo, num, pos):
-    # checks for all validity
-    # check row
-    for i in range(len(bo[0])):
-        if bo[pos[0]][i] == num and pos[1] != i:
-            return False
-
-    # check column
-    for i in range(len(bo)):
-        if bo[i][pos[1]] == num and pos[0] != i:
-            return False
-
-    # check box
-    box_x = pos[1] // 3
-    box_y = pos[0] // 3
-
-    for i in range(box_y*3, box_y*3 + 3):
-        for j in range(box_x * 3, box_x*3 + 3):
-            if bo[i][j] == num and (i,j) != pos:
-                return False
+CLEAN = bytes(81) # no dirty tiles
 
-    return True # if it gets to this point it must be valid
+# solver speeds, (name, seconds between steps), 0 means as many steps as fit in a frame
+SPEEDS = [("Slow", 0.1), ("Normal", 0.02), ("Fast", 0.002), ("Instant", 0)]
 
+class SolverAnimation:
+    # steps the backtracking solver a few moves per frame so the window keeps handling events
+    def __init__(self, board, speed=1):
+        # constructor
+        self.model = board.model
+        self.start = bytes(self.model.values) # board before solving, restored by cancel
+        if board.box == 3:
+            self.steps = solve_steps(self.model.values) # solves the model in place, yields the index of each tile it changes
+        else:
+            self.steps = fill_steps(self.model.values, board.solution)
+        self.solution = board.solution # what Instant copies onto the board
+        self.speed = speed # index into SPEEDS
+        self.due = time.perf_counter() # when the next step should be shown
+        self.last = -1 # tile highlighted by the last step
+        self.done = False
+
+    def faster(self):
+        self.speed = min(self.speed + 1, len(SPEEDS) - 1)
+
+    def slower(self):
+        self.speed = max(self.speed - 1, 0)
+
+    @instrument.timed("solver_animation")
+    def run(self, budget=0.008):
+        # applies the steps that are due, spending at most budget seconds, returns True when solving is over
+        model = self.model
+        now = start = time.perf_counter()
+        delay = SPEEDS[self.speed][1]
+        if not delay and self.solution is not None:
+            self.fill() # nothing would be shown of the search anyway
+            return self.done
+        while not self.done and now - start < budget:
+            if delay and now < self.due:
+                break # wait for the next step, this also shows each step for at least one frame
+            i = next(self.steps, -1)
+            if i < 0:
+                self.finish()
+                break
+            model.dirty[i] = 1
+            if delay:
+                self.highlight(i, 1 if model.values[i] else 2) # green outline if tried, red if taken back
+                self.due = max(self.due + delay, now - delay) # doesn't try to catch up after a slow frame
+            now = time.perf_counter()
+        return self.done
+
+    def highlight(self, i, colour=1):
+        # moves the solver outline to tile i, -1 removes it
+        model = self.model
+        if self.last >= 0:
+            model.highlight[self.last] = 0
+            model.dirty[self.last] = 1
+        if i >= 0:
+            model.highlight[i] = colour
+            model.dirty[i] = 1
+        self.last = i
+
+    def finish(self):
+        # solving is over, the solver wrote to the values directly so the masks are worked out again
+        self.done = True
+        self.highlight(-1)
+        self.model.rebuild()
+
+    def fill(self):
+        # copies the solution onto the board and ends solving, placements are checked against it so the
+        # digits already on the board agree with it
+        model = self.model
+        for i in range(len(model.values)):
+            if model.values[i] != self.solution[i]:
+                model.values[i] = self.solution[i]
+                model.dirty[i] = 1
+        self.finish()
+
+    def cancel(self):
+        # stops solving and puts the board back the way it was
+        model = self.model
+        for i in range(len(model.values)):
+            if model.values[i] != self.start[i]:
+                model.values[i] = self.start[i]
+                model.dirty[i] = 1
+        self.finish()
+
+@instrument.timed("redraw_window")
 def redraw_window(win, board, time, strikes, hits):
-    # redraws the grid
-    win.fill((255,255,255)) # fills board white
-    fnt = pygame.font.SysFont("comicsans", 30) # font for text
-    # counter for hits and misses, timer, new game button
-    textMiss = fnt.render("Misses: " + str(strikes), 1, (255, 0, 0))
-    win.blit(textMiss, (20, 560))
-    textHit = fnt.render("Hits: " + str(hits), 1, (0, 255, 0))
-    win.blit(textHit, (150, 560))
-    timer = fnt.render("Time: " + formatTime(time), 1, (0,0,0))
-    win.blit(timer, (380, 560))
+    # redraws what changed since the last frame, returns the rects to pass to pygame.display.update
+    glyph = glyphs(board.width / 9)
     mouse = pygame.mouse.get_pos()
-    # button changes color if mouse is hovering over it
-    if 247 <= mouse[0] <= 361 and 550 <= mouse[1] <= 583: 
-        pygame.draw.rect(win,(0,255,0),[247,553,111,30]) # while hovering turn button green
-    else:
-        pygame.draw.rect(win,(255,0,0),[247,553,111,30]) # while not hovering turn button red
+    hover = 247 <= mouse[0] <= 361 and 550 <= mouse[1] <= 583
+    hud = {"misses": strikes, "hits": hits, "time": time, "hover": hover}
+    full = board.hud is None
+    if full:
+        win.fill((255,255,255)) # fills board white
+        board.draw(True)
+    rects = board.draw() if not full else []
+
+    # counter for hits and misses, timer, new game button, each redrawn only when its value changes
+    if full or board.hud["misses"] != strikes:
+        rects.append(hud_text(win, glyph, (0, 543, 147, 57), (20, 560), "Misses: " + str(strikes), (255, 0, 0)))
+    if full or board.hud["hits"] != hits:
+        rects.append(hud_text(win, glyph, (147, 543, 100, 57), (150, 560), "Hits: " + str(hits), (0, 255, 0)))
+    if full or board.hud["time"] != time:
+        rects.append(hud_text(win, glyph, (362, 543, 178, 57), (380, 560), "Time: " + formatTime(time), (0,0,0)))
+    if full or board.hud["hover"] != hover:
+        # button changes color if mouse is hovering over it
+        if hover: 
+            pygame.draw.rect(win,(0,255,0),[247,553,111,30]) # while hovering turn button green
+        else:
+            pygame.draw.rect(win,(255,0,0),[247,553,111,30]) # while not hovering turn button red
+        win.blit(glyph.new_game, (250,560)) 
+        rects.append(pygame.Rect(247, 553, 111, 30))
+    board.hud = hud
 
-    newGame = fnt.render('New Game' , True , (0, 0, 0)) 
-    win.blit(newGame, (250,560)) 
-    board.draw() # draw grid and board
+    if full:
+        return [win.get_rect()]
+    return rects
+
+def hud_text(win, glyph, area, pos, text, color):
+    # clears an area below the board and draws text in it, returns the area
+    win.fill((255,255,255), area)
+    win.blit(glyph.hud.render(text, 1, color), pos)
+    return pygame.Rect(area)
 
 def formatTime(secs):
     # formats how the timer is displayed
@@ -258,226 +329,381 @@ def formatTime(secs):
         mat = " " + str(minute) + ":" + str(sec) 
     return mat
 
-def formMake(difficulty):
-    # creates and returns board of user selected difficulty
-    board = format(maker(difficulty)) # difficulty is the amount of blank spaces on the board, the more blank spaces, the harder it is
-    return board
+@instrument.timed("new_board")
+def formMake(difficulty, box=3):
+    # creates and returns board of user selected difficulty, its solution and its rating score (see rating.py)
+    # difficulty is the amount of blank spaces on the board, the more blank spaces, the harder it is
+    # boards bigger than 9x9 come flat from the exact cover generator and have no rating, they take up to 2 s to make
+    # so they are prefetched like the others
+    if box != 3:
+        if puzzles:
+            puzzle, sol, stats = puzzles.get((box, difficulty))
+        else:
+            puzzle, sol, stats = dlx.make_puzzle(box, difficulty, budget=2.0)
+        return puzzle, sol, None
+    picked = bank.pick(difficulty) if bank else None
+    if picked:
+        puzzle, sol, index = picked # unseen board from the bank
+        return puzzle, sol, bank.score(difficulty, index)
+    elif puzzles:
+        puzzle, sol, stats = puzzles.get(difficulty) # ready board, made in the background
+    else:
+        puzzle, sol, stats = make_level(difficulty)
+    return puzzle, sol, stats["score"]
+
+QUIT = "quit" # scene.next value that ends the program
+
+class Scene:
+    # one screen of the game, run() owns the current scene and swaps it for .next when that is set
+    def __init__(self):
+        # constructor
+        self.next = None # scene to switch to, or QUIT
+
+    def enter(self):
+        # called once when the scene becomes the current one, opens its window
+        pass
+
+    def leave(self):
+        # called once when another scene takes over
+        pass
+
+    def animating(self):
+        # True while the scene changes without any input, the loop then keeps drawing frames instead of waiting for events
+        return False
+
+    def handle(self, event):
+        # reacts to one pygame event
+        pass
 
-def sudGame(difficulty):
+    def update(self):
+        # advances anything that moves on its own
+        pass
+
+    def draw(self):
+        # draws a frame, returns the rects that changed or None if the whole window should be updated
+        return None
+
+# number keys, top row and keypad
+DIGIT_KEYS = {pygame.K_0: 0, pygame.K_1: 1, pygame.K_2: 2, pygame.K_3: 3, pygame.K_4: 4,
+              pygame.K_5: 5, pygame.K_6: 6, pygame.K_7: 7, pygame.K_8: 8, pygame.K_9: 9,
+              pygame.K_KP0: 0, pygame.K_KP1: 1, pygame.K_KP2: 2, pygame.K_KP3: 3, pygame.K_KP4: 4,
+              pygame.K_KP5: 5, pygame.K_KP6: 6, pygame.K_KP7: 7, pygame.K_KP8: 8, pygame.K_KP9: 9}
+
+class Game(Scene):
     # suduoku game
-    win = pygame.display.set_mode((540,600))  # game window
-    grid = formMake(difficulty) 
-    board = Grid(9, 9, 540, 540, win, grid) # calls Grid class to create a board
-    
-    # change caption based on difficulty
-    if difficulty == 44:
-        pygame.display.set_caption('Sudoku - Easy')
-    elif difficulty == 50:
-        pygame.display.set_caption('Sudoku - Medium')
-    elif difficulty == 58:
-        pygame.display.set_caption('Sudoku - Hard')
-    elif difficulty == 64:
-        pygame.display.set_caption('Sudoku - Impossible')
-
-    key = None # key pressed by user
-    start = time.time() # timer
-    strikes = 0 
-    hits = 0 # hits and strikes for the counter
-    returnKeyGate = False # fixes error where hitting return before clicking a square would crash the program
-    while True:
-        play_time = round(time.time() - start) # starts timer
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-            if event.type == pygame.KEYDOWN: # user inputs
-                if event.key == pygame.K_1:
-                    key = 1
-                if event.key == pygame.K_2:
-                    key = 2
-                if event.key == pygame.K_3:
-                    key = 3
-                if event.key == pygame.K_4:
-                    key = 4
-                if event.key == pygame.K_5:
-                    key = 5
-                if event.key == pygame.K_6:
-                    key = 6
-                if event.key == pygame.K_7:
-                    key = 7
-                if event.key == pygame.K_8:
-                    key = 8
-                if event.key == pygame.K_9:
-                    key = 9
-                if event.key == pygame.K_KP1:
-                    key = 1
-                if event.key == pygame.K_KP2:
-                    key = 2
-                if event.key == pygame.K_KP3:
-                    key = 3
-                if event.key == pygame.K_KP4:
-                    key = 4
-                if event.key == pygame.K_KP5:
-                    key = 5
-                if event.key == pygame.K_KP6:
-                    key = 6
-                if event.key == pygame.K_KP7:
-                    key = 7
-                if event.key == pygame.K_KP8:
-                    key = 8
-                if event.key == pygame.K_KP9:
-                    key = 9
-                if event.key == pygame.K_DELETE:
-                    board.clear() # deletes input if return isn't pressed
-                    key = None # reset key
-                if event.key == pygame.K_SPACE:
-                    board.solveGUI() # runs recursive solving algorithm
-                if (event.key == pygame.K_RETURN) and returnKeyGate == True:
-                    # will attempt to enter user's input to the tile, hit and strike react accordingly
-                    i, j = board.selected 
-                    if board.cubes[i][j].temp != 0:
-                        if board.place(board.cubes[i][j].temp):
-                            hits += 1
-                        else:
-                            strikes += 1
-                        key = None # reset key
-                            
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                returnKeyGate = True # fixes reutrn key error 
-                mouse = pygame.mouse.get_pos()
-                clicked = board.click(mouse)
-                if clicked: # board is clicked, select the tile that was clicked
-                    board.select(clicked[0], clicked[1])
-                    key = None # resets key
-                if 247 <= mouse[0] <= 361 and 550 <= mouse[1] <= 583:
-                    diffMenu() # if user clicks new game send them to difficulty menu
-                    pygame.quit() 
-
-        if board.selected and key != None:
-            board.sketch(key) # sketches key
-        
-        redraw_window(win, board, play_time, strikes, hits)
-        pygame.display.update() # updates frames 
+    def __init__(self, difficulty, box=3):
+        # constructor, box is 3 for the classic board, 4 for 16x16 and 5 for 25x25
+        Scene.__init__(self)
+        self.difficulty = difficulty
+        self.box = box
+        self.size = box * box
+
+    def enter(self):
+        # opens the game window and gets a board
+        self.win = pygame.display.set_mode((540,600))  # game window
+        grid, sol, score = formMake(self.difficulty, self.box) 
+        self.board = Grid(self.size, self.size, 540, 540, self.win, grid, sol) # calls Grid class to create a board, the solution is used to check placements
+
+        # change caption based on difficulty
+        self.caption = 'Sudoku'
+        if self.difficulty == 44:
+            self.caption = 'Sudoku - Easy'
+        elif self.difficulty == 50:
+            self.caption = 'Sudoku - Medium'
+        elif self.difficulty == 58:
+            self.caption = 'Sudoku - Hard'
+        elif self.difficulty == IMPOSSIBLE:
+            self.caption = 'Sudoku - Impossible'
+        if self.box != 3:
+            self.caption = 'Sudoku - %dx%d' % (self.size, self.size)
+        if score is not None:
+            self.caption += ' (rated ' + grade(score) + ')' # blank count alone says little, the rating is what the board needs
+        pygame.display.set_caption(self.caption)
+
+        self.key = None # key pressed by user
+        self.typing = 0 # number being typed on big boards, see typed()
+        self.start = time.time() # timer
+        pygame.time.set_timer(TICK, 1000) # wakes the loop every second so the timer is redrawn while the player thinks
+        self.strikes = 0 
+        self.hits = 0 # hits and strikes for the counter
+        self.returnKeyGate = False # fixes error where hitting return before clicking a square would crash the program
+        self.solver = None # running solver animation
+        self.speed = 1 # solver speed, index into SPEEDS
+
+    def leave(self):
+        pygame.time.set_timer(TICK, 0)
+
+    def animating(self):
+        return self.solver is not None
+
+    def handle(self, event):
+        board = self.board
+        if event.type == pygame.KEYDOWN and self.solver:
+            # while the solver runs the keyboard only controls it
+            if event.key in (pygame.K_SPACE, pygame.K_ESCAPE):
+                self.solver.cancel() # stops and puts the board back
+            if event.key == pygame.K_UP:
+                self.solver.faster()
+            if event.key == pygame.K_DOWN:
+                self.solver.slower()
+            self.speed = self.solver.speed
+            pygame.display.set_caption(self.caption + ' - Solving (' + SPEEDS[self.speed][0] + ')')
+        elif event.type == pygame.KEYDOWN: # user inputs
+            if event.key in DIGIT_KEYS:
+                self.typed(DIGIT_KEYS[event.key])
+            if event.key == pygame.K_DELETE:
+                board.clear() # deletes input if return isn't pressed
+                self.key = None # reset key
+                self.typing = 0
+            if event.key == pygame.K_m:
+                board.model.show_marks(not board.model.marks) # pencil marks on or off
+            if event.key == pygame.K_h:
+                self.hint()
+            if event.key == pygame.K_SPACE:
+                self.solver = board.solveGUI(self.speed) # starts the solving animation, up/down change speed, space or escape cancel
+                pygame.display.set_caption(self.caption + ' - Solving (' + SPEEDS[self.speed][0] + ')')
+            if (event.key == pygame.K_RETURN) and self.returnKeyGate == True:
+                # will attempt to enter user's input to the tile, hit and strike react accordingly
+                i, j = board.selected 
+                if board.cubes[i][j].temp != 0:
+                    if board.place(board.cubes[i][j].temp):
+                        self.hits += 1
+                    else:
+                        self.strikes += 1
+                    self.key = None # reset key
+                    self.typing = 0
+                    pygame.display.set_caption(self.caption) # drops the hint, if one was shown
+                        
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            mouse = event.pos
+            clicked = board.click(mouse)
+            if clicked and not self.solver: # board is clicked, select the tile that was clicked
+                self.returnKeyGate = True # fixes reutrn key error 
+                board.select(clicked[0], clicked[1])
+                self.key = None # resets key
+                self.typing = 0
+            if 247 <= mouse[0] <= 361 and 550 <= mouse[1] <= 583:
+                self.next = DiffMenu() # if user clicks new game send them to difficulty menu
+
+    def hint(self):
+        # selects a cell that logic alone can fill and sketches its digit, the reason goes in the window title
+        found = self.board.model.hint()
+        if found is None:
+            pygame.display.set_caption(self.caption + ' - Hint: no single left, look for pairs or guess')
+            return
+        i, digit, text = found
+        self.board.select(i // self.size, i % self.size)
+        self.returnKeyGate = True # return places the hinted digit
+        self.key = digit # sketched by update()
+        self.typing = 0
+        pygame.display.set_caption(self.caption + ' - Hint: ' + text)
+
+    def typed(self, digit):
+        # number key pressed, on boards bigger than 9x9 a second digit joins the first while the number still fits
+        # so 1 then 6 is 16 on a 16x16 board, 2 then 5 starts again at 5
+        # self.typing holds the number being typed, it is emptied as soon as no further digit could fit
+        if self.typing and self.typing * 10 + digit <= self.size:
+            self.key = self.typing * 10 + digit
+        elif digit:
+            self.key = digit
+        else:
+            self.typing = 0 # a lone 0 is no number
+            return
+        self.typing = self.key if self.key * 10 <= self.size else 0
+
+    def update(self):
+        if self.board.selected and self.key != None:
+            self.board.sketch(self.key) # sketches key
 
-def diffMenu():
+        if self.solver and self.solver.run():
+            self.solver = None # solver finished or was cancelled
+            pygame.display.set_caption(self.caption)
+
+    def draw(self):
+        play_time = round(time.time() - self.start) # starts timer
+        return redraw_window(self.win, self.board, play_time, self.strikes, self.hits) # only the parts of the frame that changed
+
+class DiffMenu(Scene):
     # difficulty menu
-    pygame.init() # initializing the constructor   
-    res = (720,720) # screen resolution 
-    screen = pygame.display.set_mode(res) # opens up a window 
-    pygame.display.set_caption('Difficulty Menu')
-    screen.fill((0,0,0)) # black screen
-    color_light = (170,170,170) # light shade of the button 
-    color_dark = (100,100,100) # dark shade of the button
-    txtColor = (18, 196, 255) # color of text
-    title2 = pygame.font.SysFont('Georgia', 50)
-    # menu text
-    title2Card = title2.render("Choose your difficulty", True, txtColor)
-    button = pygame.font.SysFont('Verdana', 35) 
-    easyBut = button.render('Easy', True, txtColor) 
-    medBut = button.render('Medium', True, txtColor) 
-    hardBut = button.render('Hard', True, txtColor) 
-    impBut = button.render('Hardest', True, txtColor) 
-    quitBut = button.render('Quit', True, txtColor)
-
-    while True:       
-        mouse = pygame.mouse.get_pos()   # stores the (x,y) coordinates into the variable as a tuple    
-        for event in pygame.event.get(): 
-            if event.type == pygame.QUIT: 
-                pygame.quit()  
-            #checks if a mouse is clicked 
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if 280 <= mouse[0] <= 420 and 220 <= mouse[1] <= 260: 
-                    sudGame(44) # easy
-                elif 280 <= mouse[0] <= 420 and 320 <= mouse[1] <= 360: 
-                    sudGame(50) # medium
-                elif 280 <= mouse[0] <= 420 and 420 <= mouse[1] <= 460: 
-                    sudGame(58) # hard
-                elif 280 <= mouse[0] <= 420 and 520 <= mouse[1] <= 560:
-                    sudGame(64) # impossible
-                elif 280 <= mouse[0] <= 420 and 620 <= mouse[1] <= 660:
-                    pygame.quit() # quit
+    def enter(self):
+        res = (720,720) # screen resolution 
+        self.screen = pygame.display.set_mode(res) # opens up a window 
+        pygame.display.set_caption('Difficulty Menu')
+        self.screen.fill((0,0,0)) # black screen
+        self.color_light = (170,170,170) # light shade of the button 
+        self.color_dark = (100,100,100) # dark shade of the button
+        txtColor = (18, 196, 255) # color of text
+        title2 = pygame.font.SysFont('Georgia', 50)
+        # menu text
+        self.title2Card = title2.render("Choose your difficulty", True, txtColor)
+        button = pygame.font.SysFont('Verdana', 35) 
+        self.easyBut = button.render('Easy', True, txtColor) 
+        self.medBut = button.render('Medium', True, txtColor) 
+        self.hardBut = button.render('Hard', True, txtColor) 
+        self.impBut = button.render('Hardest', True, txtColor) 
+        self.quitBut = button.render('Quit', True, txtColor)
+        self.bigBut = [button.render('16x16', True, txtColor), button.render('25x25', True, txtColor)]
+
+    def handle(self, event):
+        #checks if a mouse is clicked 
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            mouse = event.pos
+            if 280 <= mouse[0] <= 420 and 220 <= mouse[1] <= 260: 
+                self.next = Game(44) # easy
+            elif 280 <= mouse[0] <= 420 and 320 <= mouse[1] <= 360: 
+                self.next = Game(50) # medium
+            elif 280 <= mouse[0] <= 420 and 420 <= mouse[1] <= 460: 
+                self.next = Game(58) # hard
+            elif 280 <= mouse[0] <= 420 and 520 <= mouse[1] <= 560:
+                self.next = Game(IMPOSSIBLE) # impossible, a board that needs guessing, see sudokuGen.make_level
+            elif 280 <= mouse[0] <= 420 and 620 <= mouse[1] <= 660:
+                self.next = QUIT # quit
+            elif 500 <= mouse[0] <= 640 and 220 <= mouse[1] <= 260:
+                self.next = Game(BIG[4], 4) # 16x16
+            elif 500 <= mouse[0] <= 640 and 320 <= mouse[1] <= 360:
+                self.next = Game(BIG[5], 5) # 25x25
 
+    def draw(self):
+        screen = self.screen
+        mouse = pygame.mouse.get_pos()   # stores the (x,y) coordinates into the variable as a tuple    
         # if mouse is hovered on a button it changes to lighter shade 
         if 280 <= mouse[0] <= 420 and 220 <= mouse[1] <= 260:
-            pygame.draw.rect(screen,color_light,[280,220,140,40]) 
+            pygame.draw.rect(screen,self.color_light,[280,220,140,40]) 
         elif 280 <= mouse[0] <= 420 and 320 <= mouse[1] <= 360: 
-            pygame.draw.rect(screen,color_light,[280,320,140,40]) 
+            pygame.draw.rect(screen,self.color_light,[280,320,140,40]) 
         elif 280 <= mouse[0] <= 420 and 420 <= mouse[1] <= 460: 
-            pygame.draw.rect(screen,color_light,[280,420,140,40]) 
+            pygame.draw.rect(screen,self.color_light,[280,420,140,40]) 
         elif 280 <= mouse[0] <= 420 and 520 <= mouse[1] <= 560: 
-            pygame.draw.rect(screen,color_light,[280,520,140,40]) 
+            pygame.draw.rect(screen,self.color_light,[280,520,140,40]) 
         elif 280 <= mouse[0] <= 420 and 620 <= mouse[1] <= 660: 
-            pygame.draw.rect(screen,color_light,[280,620,140,40]) 
+            pygame.draw.rect(screen,self.color_light,[280,620,140,40]) 
+        elif 500 <= mouse[0] <= 640 and 220 <= mouse[1] <= 260:
+            pygame.draw.rect(screen,self.color_light,[500,220,140,40])
+        elif 500 <= mouse[0] <= 640 and 320 <= mouse[1] <= 360:
+            pygame.draw.rect(screen,self.color_light,[500,320,140,40])
         else:
-            pygame.draw.rect(screen,color_dark,[280,220,140,40]) 
-            pygame.draw.rect(screen,color_dark,[280,320,140,40]) 
-            pygame.draw.rect(screen,color_dark,[280,420,140,40]) 
-            pygame.draw.rect(screen,color_dark,[280,520,140,40]) 
-            pygame.draw.rect(screen,color_dark,[280,620,140,40])  
+            pygame.draw.rect(screen,self.color_dark,[280,220,140,40]) 
+            pygame.draw.rect(screen,self.color_dark,[280,320,140,40]) 
+            pygame.draw.rect(screen,self.color_dark,[280,420,140,40]) 
+            pygame.draw.rect(screen,self.color_dark,[280,520,140,40]) 
+            pygame.draw.rect(screen,self.color_dark,[280,620,140,40])  
+            pygame.draw.rect(screen,self.color_dark,[500,220,140,40])
+            pygame.draw.rect(screen,self.color_dark,[500,320,140,40])
         
         # superimposing the text onto our button 
-        screen.blit(easyBut, (305, 216))
-        screen.blit(medBut, (281, 316))
-        screen.blit(hardBut, (305, 418)) 
-        screen.blit(impBut, (280, 518))  
-        screen.blit(quitBut, (305, 616))
-        screen.blit(title2Card, (120, 129))  
-      
-        pygame.display.update() # updates the frames of the game 
-
-def main():
+        screen.blit(self.easyBut, (305, 216))
+        screen.blit(self.medBut, (281, 316))
+        screen.blit(self.hardBut, (305, 418)) 
+        screen.blit(self.impBut, (280, 518))  
+        screen.blit(self.quitBut, (305, 616))
+        screen.blit(self.bigBut[0], (518, 216))
+        screen.blit(self.bigBut[1], (518, 316))
+        screen.blit(self.title2Card, (120, 129))  
+        return None # updates the whole frame
+
+class MainMenu(Scene):
     # main menu
-    pygame.init() # initializing the constructor   
-    res = (720,720) # screen resolution 
-    screen = pygame.display.set_mode(res) # opens up a window 
-    pygame.display.set_caption('Main Menu')
-    screen.fill((0,0,0)) # black screen
-    color_light = (170,170,170) # light shade of the button 
-    color_dark = (100,100,100) # dark shade of the button 
-    txtColor = (18, 196, 255) # color of text
-    title = pygame.font.SysFont('Georgia', 100)
-    button = pygame.font.SysFont('Verdana', 35) # fonts for text
-    info = pygame.font.SysFont('Verdana', 24)
-    # main menu info
-    titleCard = title.render("Cam's Sudoku", True, txtColor)
-    startButton = button.render('Start' , True , txtColor) 
-    quitButton = button.render('Quit' , True , txtColor) 
-    info1 = info.render('Hello and welcome to my Sudoku game! All standard', True, txtColor) 
-    info2 = info.render('Sudoku rules apply. To input a number simply click', True, txtColor) 
-    info3 = info.render('a square, choose 1-9, and press return.', True, txtColor) 
-    info4 = info.render('You can press the spacebar at any point and watch my', True, txtColor)     
-    info5 = info.render('recursive backtracking algorithm solve the board', True, txtColor)     
-
-    while True: 
-        mouse = pygame.mouse.get_pos() # stores the (x,y) coordinates into the variable as a tuple 
-        for event in pygame.event.get(): # any action from user
-            if event.type == pygame.QUIT: # quits game
-                pygame.quit()       
-            if event.type == pygame.MOUSEBUTTONDOWN: # checks if a mouse is clicked 
-                if 280 <= mouse[0] <= 420 and 360 <= mouse[1] <= 400: 
-                    diffMenu() # sends user to difficulty menu
-                if 280 <= mouse[0] <= 420 and 460<= mouse[1] <= 500: 
-                    pygame.quit() 
+    def enter(self):
+        res = (720,720) # screen resolution 
+        self.screen = pygame.display.set_mode(res) # opens up a window 
+        pygame.display.set_caption('Main Menu')
+        self.screen.fill((0,0,0)) # black screen
+        self.color_light = (170,170,170) # light shade of the button 
+        self.color_dark = (100,100,100) # dark shade of the button 
+        txtColor = (18, 196, 255) # color of text
+        title = pygame.font.SysFont('Georgia', 100)
+        button = pygame.font.SysFont('Verdana', 35) # fonts for text
+        info = pygame.font.SysFont('Verdana', 24)
+        # main menu info
+        self.titleCard = title.render("Cam's Sudoku", True, txtColor)
+        self.startButton = button.render('Start' , True , txtColor) 
+        self.quitButton = button.render('Quit' , True , txtColor) 
+        self.info = [
+            info.render('Hello and welcome to my Sudoku game! All standard', True, txtColor),
+            info.render('Sudoku rules apply. To input a number simply click', True, txtColor),
+            info.render('a square, choose 1-9, and press return.', True, txtColor),
+            info.render('You can press the spacebar at any point and watch my', True, txtColor),
+            info.render('recursive backtracking algorithm solve the board', True, txtColor),
+        ]
+
+    def handle(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN: # checks if a mouse is clicked 
+            mouse = event.pos
+            if 280 <= mouse[0] <= 420 and 360 <= mouse[1] <= 400: 
+                self.next = DiffMenu() # sends user to difficulty menu
+            if 280 <= mouse[0] <= 420 and 460<= mouse[1] <= 500: 
+                self.next = QUIT
 
+    def draw(self):
+        screen = self.screen
+        mouse = pygame.mouse.get_pos() # stores the (x,y) coordinates into the variable as a tuple 
         # if mouse is hovered on a button it changes to lighter shade 
         if 280 <= mouse[0] <= 420 and 360 <= mouse[1] <= 400: 
-            pygame.draw.rect(screen,color_light,[280,360,140,40])
+            pygame.draw.rect(screen,self.color_light,[280,360,140,40])
             
         elif 280 <= mouse[0] <= 420 and 460 <= mouse[1] <= 500: 
-            pygame.draw.rect(screen,color_light,[280,460,140,40]) 
+            pygame.draw.rect(screen,self.color_light,[280,460,140,40]) 
         else:
-            pygame.draw.rect(screen,color_dark,[280,360,140,40]) 
-            pygame.draw.rect(screen,color_dark,[280,460,140,40]) 
+            pygame.draw.rect(screen,self.color_dark,[280,360,140,40]) 
+            pygame.draw.rect(screen,self.color_dark,[280,460,140,40]) 
       
         # superimposing the text onto our button 
-        screen.blit(startButton, (303,356))
-        screen.blit(quitButton, (310, 455)) 
-        screen.blit(info1, (20,535))  
-        screen.blit(info2, (20,560))  
-        screen.blit(info3, (20,585))  
-        screen.blit(info4, (20,630))  
-        screen.blit(info5, (20,655))  
-        screen.blit(titleCard, (50, 120))
-        
+        screen.blit(self.startButton, (303,356))
+        screen.blit(self.quitButton, (310, 455)) 
+        for k, y in enumerate((535, 560, 585, 630, 655)):
+            screen.blit(self.info[k], (20, y))  
+        screen.blit(self.titleCard, (50, 120))
+        return None # updates the whole frame
+
+def step(scene, events):
+    # feeds one frame of events to the current scene and draws it, returns the scene for the next frame or None to quit
+    for event in events:
+        if event.type == pygame.QUIT: # quits game
+            return None
+        scene.handle(event)
+        if scene.next:
+            break # the rest of this frame's events belonged to the old scene
+
+    if scene.next:
+        scene.leave()
+        if scene.next == QUIT:
+            return None
+        new = scene.next
+        scene.next = None # drops the only reference the old scene had to the new one
+        scene = new # the old scene is freed here
+        scene.enter()
+
+    scene.update()
+    rects = scene.draw()
+    if rects is None:
         pygame.display.update() # updates the frames of the game 
-        
-main() # starts program
+    elif rects:
+        pygame.display.update(rects) # updates only the parts of the frame that changed
+    return scene
+
+def run(scene, frames):
+    # the only event loop, owns the current scene, frames is the FrameScheduler that decides when the next frame starts
+    scene.enter()
+    scene = step(scene, []) # first frame
+    while scene:
+        scene = step(scene, frames.wait(scene.animating()))
+
+def main(fps=60, frame_stats=False, bank_path=None):
+    global puzzles, bank
+    if bank_path:
+        bank = PuzzleBank(bank_path) # maps the file, takes the same time however many boards it holds
+    puzzles = Prefetcher() # starts making boards while the user reads the menu, for difficulties the bank doesn't have
+    pygame.init() # initializing the constructor   
+    frames = FrameScheduler(fps)
+    try:
+        run(MainMenu(), frames)
+    finally:
+        puzzles.stop()
+        if bank:
+            bank.close()
+        pygame.quit()
+        if frame_stats:
+            print("frames %(frames)d  avg %(avg_ms).2f ms  p95 %(p95_ms).2f ms  max %(max_ms).2f ms  idle %(idle_pct).1f%%" % frames.stats())
+
+if __name__ == "__main__":
+    main() # starts program, sudoku.py is the entry point with options
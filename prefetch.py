@@ -0,0 +1,91 @@
+import threading, time, random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from sudokuGen import make_level, IMPOSSIBLE
+import dlx
+import instrument
+
+"""
+keeps a few ready boards per difficulty so starting a game doesn't wait for the generator
+"""
+
+DIFFICULTIES = (44, 50, 58, IMPOSSIBLE) # easy, medium, hard, impossible
+BIG = {4: 140, 5: 281} # box -> blanks of the 16x16 and 25x25 boards, about as many as still make unique boards in well under a second
+
+def make_board(key):
+    # one board for a queue, key is a level of a 9x9 board (see sudokuGen.make_level) or (box, blanks) for the bigger ones
+    if isinstance(key, tuple):
+        box, blanks = key
+        return dlx.make_puzzle(box, blanks, budget=2.0) # up to 2 s, the reason big boards are made ahead too
+    return make_level(key)
+
+class Prefetcher:
+    # ready queue of (puzzle, solution, stats) per difficulty, refilled in the background
+    # a difficulty is a 9x9 blank count or a (box, blanks) pair for the bigger boards, see make_board
+    def __init__(self, depth=2, difficulties=DIFFICULTIES + tuple(BIG.items()), processes=True):
+        # constructor, depth is how many boards to keep ready per difficulty
+        self.depth = depth
+        self.ready = {diff: deque() for diff in difficulties}
+        self.latency = {diff: deque(maxlen=20) for diff in difficulties} # seconds it took to make the last boards
+        self.misses = 0 # times get() found the queue empty and had to make a board itself
+        self.cond = threading.Condition()
+        self.running = True
+        # boards are made in a worker process so generation doesn't compete with the game for the GIL
+        self.pool = ProcessPoolExecutor(1, initializer=random.seed) if processes else None
+        self.thread = threading.Thread(target=self.fill, daemon=True)
+        self.thread.start()
+
+    def make(self, diff):
+        # makes one board, in the worker process if there is one
+        if self.pool:
+            return self.pool.submit(make_board, diff).result()
+        return make_board(diff)
+
+    def fill(self):
+        # refill thread, tops up the emptiest queue until they are all full
+        while True:
+            with self.cond:
+                while self.running and all(len(q) >= self.depth for q in self.ready.values()):
+                    self.cond.wait()
+                if not self.running:
+                    return
+                diff = min(self.ready, key=lambda d: len(self.ready[d]))
+            start = time.perf_counter()
+            try:
+                board = self.make(diff)
+            except (RuntimeError, CancelledError):
+                return # pool was shut down before or while we were waiting on it
+            if self.pool and instrument.ENABLED: # made in the worker, which doesn't report its own counts
+                instrument.generated(board[2], "generate.%dx%d" % (diff[0]**2, diff[0]**2) if isinstance(diff, tuple) else "generate")
+            with self.cond:
+                self.ready[diff].append(board)
+                self.latency[diff].append(time.perf_counter() - start)
+
+    def get(self, diff):
+        # returns a ready board, only makes one on the spot if the queue for diff is empty
+        with self.cond:
+            if self.ready.get(diff):
+                board = self.ready[diff].popleft()
+                self.cond.notify() # wake the refill thread
+                return board
+            self.misses += 1
+        return make_board(diff)
+
+    def stats(self):
+        # queue depth and average refill latency in seconds per difficulty, used to size depth
+        with self.cond:
+            return {
+                diff: {
+                    "ready": len(self.ready[diff]),
+                    "refill": sum(self.latency[diff]) / len(self.latency[diff]) if self.latency[diff] else None,
+                }
+                for diff in self.ready
+            }
+
+    def stop(self):
+        # stops the refill thread and the worker process
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,248 @@
+import os, sys, mmap, struct, random, argparse
+from math import gcd
+
+"""
+packed puzzle bank, a file of fixed size records that is memory-mapped so opening it doesn't depend on its size
+
+bank file:
+    header   "SDKB", version, record size, number of difficulties           (struct HEADER)
+    groups   one per difficulty: blanks, first record, record count          (struct GROUP)
+    records  grouped by difficulty, RECORD bytes each:
+             solution, 81 digits packed 2 per byte (41 bytes)
+             givens, 81 bits, bit i set when cell i is shown in the puzzle (11 bytes)
+             score, difficulty rating from rating.py (1 byte)
+the puzzle is the solution with the cells that aren't givens blanked, so a record holds both and the score in 53 bytes
+version 1 banks (52 byte records, no score) have to be rebuilt
+
+played file (<bank>.played), made on first use:
+    per difficulty: step, offset and cursor of a random walk over its records  (struct WALK)
+    one bit per record, set once the puzzle has been dealt
+picking a puzzle takes the next record of the walk, so it is O(1) and only touches one record and one bit
+"""
+
+MAGIC = b"SDKB"
+VERSION = 2
+HEADER = struct.Struct("<4sHHI") # magic, version, record size, groups
+GROUP = struct.Struct("<III") # blanks, first record, count
+WALK = struct.Struct("<III") # step, offset, cursor
+SOLUTION = 41
+GIVENS = 11
+SCORE = 1
+RECORD = SOLUTION + GIVENS + SCORE
+
+def pack(puzzle, solution, score):
+    # record bytes from two 81 digit sequences and a rating score
+    sol = bytes(solution) + b"\x00" # pad to an even number of cells
+    packed = bytes((sol[i] << 4) | sol[i + 1] for i in range(0, 82, 2))
+    mask = 0
+    for i in range(81):
+        if puzzle[i]:
+            mask |= 1 << i
+    return packed + mask.to_bytes(GIVENS, "little") + bytes((min(255, score),))
+
+def unpack(record):
+    # (puzzle, solution) as 9x9 lists from record bytes
+    sol = []
+    for b in record[:SOLUTION]:
+        sol.append(b >> 4)
+        sol.append(b & 15)
+    mask = int.from_bytes(record[SOLUTION:SOLUTION + GIVENS], "little")
+    puzzle = [sol[i] if mask >> i & 1 else 0 for i in range(81)]
+    return [puzzle[r*9:r*9 + 9] for r in range(9)], [sol[r*9:r*9 + 9] for r in range(9)]
+
+def build(sources, path, dedup=False):
+    # makes a bank from batchgen.py text files, two passes so memory use doesn't grow with the number of puzzles
+    # dedup leaves out puzzles that are symmetric copies of an earlier one (see canonical.py), the index it needs is
+    # the one thing that grows, about 200 bytes a puzzle; returns {blanks: puzzles} and the number left out
+    from batchgen import parse_line
+    from rating import rate
+    counts = {}
+    index = None
+    skip = set() # (source, line number) of the duplicates
+    bad = set() # (source, line number) of puzzles that can't be rated, see below
+    scores = {} # (source, line number) -> score of lines from files made before rating, which have none
+    if dedup:
+        from canonical import DedupIndex
+        index = DedupIndex()
+    for k, source in enumerate(sources):
+        with open(source) as f:
+            for n, line in enumerate(f):
+                parsed = parse_line(line)
+                if parsed:
+                    if "score" not in parsed[3]:
+                        score = rate([int(c) for c in parsed[0]])[0]
+                        if score is None:
+                            bad.add((k, n)) # givens clash or there is no solution, left out like a damaged line
+                            continue
+                        scores[(k, n)] = score
+                    if index is not None and not index.add(parsed[0]):
+                        skip.add((k, n))
+                        continue
+                    counts[parsed[2]] = counts.get(parsed[2], 0) + 1
+
+    diffs = sorted(counts)
+    start = {}
+    first = 0
+    for diff in diffs:
+        start[diff] = first
+        first += counts[diff]
+    data = HEADER.size + GROUP.size * len(diffs) # where records begin
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD, len(diffs)))
+        for diff in diffs:
+            f.write(GROUP.pack(diff, start[diff], counts[diff]))
+        f.truncate(data + RECORD * first)
+
+    if first == 0:
+        return counts, len(skip) # nothing to write, an empty file can't be mapped
+    with open(path, "r+b") as f:
+        out = mmap.mmap(f.fileno(), 0)
+        slot = dict(start) # next free record of each difficulty
+        for k, source in enumerate(sources):
+            with open(source) as src:
+                for n, line in enumerate(src):
+                    parsed = parse_line(line)
+                    if parsed and (k, n) not in skip and (k, n) not in bad:
+                        puzzle, solution, diff, stats = parsed
+                        score = int(stats["score"]) if "score" in stats else scores[(k, n)]
+                        at = data + RECORD * slot[diff]
+                        out[at:at + RECORD] = pack([int(c) for c in puzzle], [int(c) for c in solution], score)
+                        slot[diff] += 1
+        out.flush()
+        out.close()
+    return counts, len(skip)
+
+class PuzzleBank:
+    # a bank file opened for dealing puzzles
+    def __init__(self, path, played=None):
+        # constructor, maps the bank and its played file, neither is read in full
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION or size != RECORD:
+            raise ValueError("%s is not a version %d puzzle bank" % (path, VERSION))
+        self.groups = {} # blanks -> (position in group table, first record, count)
+        for k in range(count):
+            diff, first, n = GROUP.unpack_from(self.data, HEADER.size + GROUP.size * k)
+            self.groups[diff] = (k, first, n)
+        self.offset = HEADER.size + GROUP.size * count # where records begin
+        self.total = sum(n for k, first, n in self.groups.values())
+        self.open_played(played or path + ".played", count)
+
+    def open_played(self, path, count):
+        # maps the played file, making it with a fresh random walk per difficulty if it doesn't exist yet
+        size = WALK.size * count + (self.total + 7) // 8
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            with open(path, "wb") as f:
+                for diff in sorted(self.groups, key=lambda d: self.groups[d][0]):
+                    f.write(WALK.pack(*new_walk(self.groups[diff][2]), 0))
+                f.truncate(size)
+        self.bits = WALK.size * count # where the bitmap begins
+        if size == 0:
+            self.played_file = self.played = None # bank without puzzles, an empty file can't be mapped
+            return
+        self.played_file = open(path, "r+b")
+        self.played = mmap.mmap(self.played_file.fileno(), 0)
+
+    def difficulties(self):
+        # blank counts the bank has puzzles for
+        return sorted(self.groups)
+
+    def count(self, diff):
+        # number of puzzles of a difficulty
+        return self.groups[diff][2] if diff in self.groups else 0
+
+    def get(self, diff, index):
+        # (puzzle, solution) of the index-th puzzle of a difficulty
+        k, first, n = self.groups[diff]
+        at = self.offset + RECORD * (first + index)
+        return unpack(self.data[at:at + RECORD])
+
+    def score(self, diff, index):
+        # rating score of the index-th puzzle of a difficulty
+        k, first, n = self.groups[diff]
+        return self.data[self.offset + RECORD * (first + index) + SOLUTION + GIVENS]
+
+    def is_played(self, diff, index):
+        k, first, n = self.groups[diff]
+        i = first + index
+        return bool(self.played[self.bits + i // 8] >> (i % 8) & 1)
+
+    def mark_played(self, diff, index):
+        k, first, n = self.groups[diff]
+        i = first + index
+        self.played[self.bits + i // 8] |= 1 << (i % 8)
+
+    def pick(self, diff):
+        # (puzzle, solution, index) of a random puzzle that hasn't been dealt yet, None if the bank has none of diff
+        # once every puzzle of diff has been dealt the played bits of diff are cleared and a new walk starts
+        if self.played is None or not self.count(diff):
+            return None
+        k, first, n = self.groups[diff]
+        at = WALK.size * k
+        step, offset, cursor = WALK.unpack_from(self.played, at)
+        while True:
+            if cursor >= n:
+                self.reset(diff)
+                step, offset, cursor = WALK.unpack_from(self.played, at)
+            index = (offset + step * cursor) % n # step is coprime with n so the walk visits every record once
+            cursor += 1
+            if not self.is_played(diff, index): # skips puzzles marked played some other way
+                break
+        WALK.pack_into(self.played, at, step, offset, cursor)
+        self.mark_played(diff, index)
+        puzzle, solution = self.get(diff, index)
+        return puzzle, solution, index
+
+    def reset(self, diff):
+        # forgets which puzzles of diff were dealt and starts a new random walk
+        k, first, n = self.groups[diff]
+        WALK.pack_into(self.played, WALK.size * k, *new_walk(n), 0)
+        for i in range(first, first + n):
+            self.played[self.bits + i // 8] &= ~(1 << (i % 8)) & 0xFF
+
+    def close(self):
+        if self.played is not None:
+            self.played.flush()
+            self.played.close()
+            self.played_file.close()
+        self.data.close()
+        self.file.close()
+
+def new_walk(n):
+    # random (step, offset) with step coprime to n, so offset + step*k mod n runs through every record
+    if n <= 1:
+        return 1, 0
+    step = random.randrange(1, n)
+    while gcd(step, n) != 1:
+        step = random.randrange(1, n)
+    return step, random.randrange(n)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="packed puzzle bank")
+    sub = parser.add_subparsers(dest="command", required=True)
+    make = sub.add_parser("build", help="pack batchgen.py output into a bank")
+    make.add_argument("bank")
+    make.add_argument("sources", nargs="+")
+    make.add_argument("--dedup", action="store_true", help="leave out puzzles that are symmetric copies of earlier ones")
+    info = sub.add_parser("info", help="show how many puzzles the bank holds")
+    info.add_argument("bank")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        counts, duplicates = build(args.sources, args.bank, args.dedup)
+        for diff in sorted(counts):
+            print("%d blanks: %d puzzles" % (diff, counts[diff]))
+        if args.dedup:
+            print("%d duplicates left out" % duplicates)
+        print("%s: %.1f MB" % (args.bank, os.path.getsize(args.bank) / 2**20))
+    else:
+        bank = PuzzleBank(args.bank)
+        for diff in bank.difficulties():
+            played = sum(bank.is_played(diff, i) for i in range(bank.count(diff)))
+            print("%d blanks: %d puzzles, %d played" % (diff, bank.count(diff), played))
+        bank.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
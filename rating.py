@@ -0,0 +1,270 @@
+from solver import ALL, UNITS, BOX, COUNT, DIGITS, DIGIT, load
+import instrument
+
+"""
+difficulty rating, solves a puzzle the way a person would and scores it by the hardest technique it needed
+the ladder, cheapest first, the solver always goes back to the bottom after a step makes progress:
+    hidden single    a digit has one place left in a row, column or box
+    naked single     a cell has one digit left
+    locked           a digit of a box sits in one row/column of it (pointing) or the reverse (claiming)
+    naked pair       two cells of a unit with the same two candidates
+    hidden pair      two digits with the same two places in a unit
+    x-wing           a digit in exactly two places in two rows (or columns), lined up
+when none of them helps the rest is guessed (singles only), every digit tried counts as a guess
+score = rating of the hardest technique used, or GUESS + number of guesses, capped at 255 so it fits in a byte
+"""
+
+HIDDEN_SINGLE = 10
+NAKED_SINGLE = 15
+LOCKED = 25
+NAKED_PAIR = 30
+HIDDEN_PAIR = 35
+X_WING = 40
+GUESS = 50
+TECHNIQUES = {"hidden_single": HIDDEN_SINGLE, "naked_single": NAKED_SINGLE, "locked": LOCKED,
+              "naked_pair": NAKED_PAIR, "hidden_pair": HIDDEN_PAIR, "x_wing": X_WING}
+
+# grade names and the highest score of each
+GRADES = (("easy", HIDDEN_SINGLE), ("medium", NAKED_SINGLE), ("hard", NAKED_PAIR), ("expert", GUESS - 1), ("extreme", 255))
+
+PEERS = [tuple(j for j in range(81) if j != i and (j // 9 == i // 9 or j % 9 == i % 9 or BOX[j] == BOX[i])) for i in range(81)]
+ROWS = UNITS[:9]
+COLS = UNITS[9:18]
+
+# box/line intersections as (3 shared cells, rest of the box, rest of the line), for locked candidates
+INTERSECTIONS = []
+for b in range(9):
+    box = UNITS[18 + b]
+    for line in [ROWS[(b // 3) * 3 + k] for k in range(3)] + [COLS[(b % 3) * 3 + k] for k in range(3)]:
+        INTERSECTIONS.append(([i for i in box if i in line], [i for i in box if i not in line], [i for i in line if i not in box]))
+
+
+def grade(score):
+    # name of the grade a score falls in, "unrated" for None, the score rate() gives a board it can't finish
+    if score is None:
+        return "unrated"
+    for name, top in GRADES:
+        if score <= top:
+            return name
+    return GRADES[-1][0]
+
+
+def place(cells, cand, i, bit):
+    # fills cell i and takes its digit out of the candidates of its peers
+    cells[i] = DIGIT[bit]
+    cand[i] = 0
+    keep = ~bit
+    for p in PEERS[i]:
+        cand[p] &= keep
+
+
+def hidden_single(cells, cand):
+    # places every digit that has one place left in a unit, returns number placed, -1 on a contradiction
+    placed = 0
+    for unit in UNITS:
+        once = 0
+        twice = 0
+        for i in unit:
+            m = cand[i]
+            twice |= once & m
+            once |= m
+        hidden = once & ~twice
+        if hidden:
+            for i in unit:
+                bit = cand[i] & hidden
+                if bit:
+                    if bit & (bit - 1):
+                        return -1 # two digits need the same cell
+                    place(cells, cand, i, bit)
+                    placed += 1
+    return placed
+
+
+def naked_single(cells, cand):
+    # places every cell that has one candidate left, returns number placed, -1 on a contradiction
+    placed = 0
+    for i in range(81):
+        if cells[i] == 0:
+            m = cand[i]
+            if not m:
+                return -1 # nothing fits in this cell
+            if not m & (m - 1):
+                place(cells, cand, i, m)
+                placed += 1
+    return placed
+
+
+def locked(cells, cand):
+    # pointing and claiming, returns True if a candidate was removed
+    found = False
+    for inter, box_rest, line_rest in INTERSECTIONS:
+        shared = cand[inter[0]] | cand[inter[1]] | cand[inter[2]]
+        if not shared:
+            continue
+        in_box = 0
+        for i in box_rest:
+            in_box |= cand[i]
+        in_line = 0
+        for i in line_rest:
+            in_line |= cand[i]
+        pointing = shared & ~in_box & in_line # only in the shared cells of the box, so not elsewhere on the line
+        claiming = shared & ~in_line & in_box # only in the shared cells of the line, so not elsewhere in the box
+        if pointing:
+            for i in line_rest:
+                cand[i] &= ~pointing
+            found = True
+        if claiming:
+            for i in box_rest:
+                cand[i] &= ~claiming
+            found = True
+    return found
+
+
+def naked_pair(cells, cand):
+    # two cells of a unit with the same two candidates, returns True if a candidate was removed
+    found = False
+    for unit in UNITS:
+        seen = {}
+        for i in unit:
+            m = cand[i]
+            if COUNT[m] == 2:
+                if m in seen:
+                    for p in unit:
+                        if p != i and p != seen[m] and cand[p] & m:
+                            cand[p] &= ~m
+                            found = True
+                else:
+                    seen[m] = i
+    return found
+
+
+def hidden_pair(cells, cand):
+    # two digits that share the same two places in a unit, those cells lose their other candidates
+    found = False
+    for unit in UNITS:
+        where = [0] * 9 # where[d-1] = positions in the unit where d fits, one bit per position
+        for k in range(9):
+            m = cand[unit[k]]
+            for d in DIGITS[m]:
+                where[d - 1] |= 1 << k
+        seen = {}
+        for d in range(9):
+            w = where[d]
+            if COUNT[w] == 2:
+                if w in seen:
+                    pair = (1 << d) | (1 << seen[w])
+                    for k in DIGITS[w]: # DIGITS works on any 9 bit mask, here it gives position + 1
+                        i = unit[k - 1]
+                        if cand[i] & ~pair:
+                            cand[i] &= pair
+                            found = True
+                else:
+                    seen[w] = d
+    return found
+
+
+def x_wing(cells, cand):
+    # a digit in the same two places of two rows can't be anywhere else in those two columns (and rows/columns swapped)
+    found = False
+    for bit in (1 << d for d in range(9)):
+        for base, cross in ((ROWS, COLS), (COLS, ROWS)):
+            seen = {}
+            for n in range(9):
+                w = 0
+                line = base[n]
+                for k in range(9):
+                    if cand[line[k]] & bit:
+                        w |= 1 << k
+                if COUNT[w] != 2:
+                    continue
+                if w not in seen:
+                    seen[w] = n
+                    continue
+                for k in DIGITS[w]:
+                    other = cross[k - 1] # position k-1 of a base line lies on cross line k-1
+                    for m in range(9):
+                        if m != n and m != seen[w] and cand[other[m]] & bit: # position m of a cross line is on base line m
+                            cand[other[m]] &= ~bit
+                            found = True
+    return found
+
+
+LADDER = (("locked", locked), ("naked_pair", naked_pair), ("hidden_pair", hidden_pair), ("x_wing", x_wing))
+
+
+def logic(cells, cand, steps):
+    # runs the ladder until it stalls, returns False on a contradiction
+    while True:
+        n = hidden_single(cells, cand)
+        if n < 0:
+            return False
+        if n:
+            steps["hidden_single"] += n
+            continue
+        n = naked_single(cells, cand)
+        if n < 0:
+            return False
+        if n:
+            steps["naked_single"] += n
+            continue
+        if 0 not in cells:
+            return True
+        for name, technique in LADDER:
+            if technique(cells, cand):
+                steps[name] += 1
+                break
+        else:
+            return True # stalled
+
+
+def guess(cells, cand, steps):
+    # finishes the board by trial and error with singles, returns the solved cells or None
+    while True:
+        n = hidden_single(cells, cand)
+        if n < 0:
+            return None
+        if not n:
+            n = naked_single(cells, cand)
+            if n < 0:
+                return None
+            if not n:
+                break
+    best = None
+    fewest = 10
+    for i in range(81):
+        if cells[i] == 0:
+            n = COUNT[cand[i]]
+            if n < fewest:
+                best, fewest = i, n
+                if n == 2:
+                    break
+    if best is None:
+        return cells
+    for d in DIGITS[cand[best]]:
+        steps["guess"] += 1
+        child, child_cand = cells[:], cand[:]
+        place(child, child_cand, best, 1 << (d - 1))
+        result = guess(child, child_cand, steps)
+        if result is not None:
+            return result
+    return None
+
+
+@instrument.timed("rate")
+def rate(grid):
+    # (score, steps) of a 9x9 grid or 81 flat digits, steps counts how often each technique was used plus "guess"
+    # the score is None if the grid has no solution
+    state = load(grid)
+    if state is None:
+        return None, None
+    cells, rows, cols, boxes = state
+    cand = [0 if cells[i] else ALL & ~(rows[i // 9] | cols[i % 9] | boxes[BOX[i]]) for i in range(81)]
+    steps = dict.fromkeys(TECHNIQUES, 0)
+    steps["guess"] = 0
+    if not logic(cells, cand, steps):
+        return None, steps
+    if 0 in cells and guess(cells, cand, steps) is None:
+        return None, steps
+    if steps["guess"]:
+        return min(255, GUESS + steps["guess"]), steps
+    return max([TECHNIQUES[name] for name in TECHNIQUES if steps[name]] or [0]), steps
@@ -0,0 +1,49 @@
+import pygame
+import instrument
+
+"""
+glyph cache used by mainMenu.py, every number is rendered once per session instead of once per tile per frame
+"""
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREY = (128, 128, 128)
+
+class Glyphs:
+    # pre-rendered numbers and text for one tile size and board size
+    def __init__(self, gap, size=9):
+        # constructor, fonts are only loaded here
+        gap = int(gap)
+        self.gap = gap
+        self.font = pygame.font.SysFont("comicsans", min(40, gap * 2 // 3)) # font for tiles, 40 on the 60 pixel tiles of 9x9
+        self.hud = pygame.font.SysFont("comicsans", 30) # font for counters, timer and button
+        self.given = [None] + [self.font.render(str(d), 1, BLACK) for d in range(1, size + 1)] # placed numbers, index is the number
+        self.sketch = [None] + [self.font.render(str(d), 1, GREY) for d in range(1, size + 1)] # sketched numbers
+        box = int(round(size ** 0.5))
+        small = pygame.font.SysFont("comicsans", max(8, gap // box)) # candidates, box x box of them share a tile
+        self.mark = [None] + [small.render(str(d), 1, GREY) for d in range(1, size + 1)]
+        # whole tiles shown by the solver, green outline when a digit is tried and red when it is taken back
+        # index 0 is an empty tile, shown when the solver takes a digit back
+        self.solver = {True: [self.tile(d, (0, 255, 0)) for d in range(size + 1)],
+                       False: [self.tile(d, (255, 0, 0)) for d in range(size + 1)]}
+        self.new_game = self.hud.render('New Game', True, BLACK)
+
+    def tile(self, digit, outline):
+        # renders a white tile with a digit (none for 0) and a coloured outline
+        surf = pygame.Surface((self.gap, self.gap))
+        surf.fill(WHITE)
+        if digit:
+            text = self.given[digit]
+            surf.blit(text, (self.gap/2 - text.get_width()/2, self.gap/2 - text.get_height()/2))
+        pygame.draw.rect(surf, outline, (0, 0, self.gap, self.gap), 3)
+        return surf
+
+_cache = {} # (tile size, board size) -> Glyphs
+
+@instrument.timed("glyphs")
+def glyphs(gap, size=9):
+    # returns the glyphs for a tile size, rendering them the first time they are asked for
+    key = (int(gap), size)
+    if key not in _cache:
+        _cache[key] = Glyphs(key[0], size)
+    return _cache[key]
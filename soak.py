@@ -0,0 +1,70 @@
+import os, sys, time, gc, argparse, tracemalloc
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no window needed
+import pygame
+import mainMenu
+
+"""
+soak test, plays thousands of short games through the scene loop and checks that memory stays flat
+"""
+
+def click(pos):
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+
+def key(k):
+    return pygame.event.Event(pygame.KEYDOWN, key=k)
+
+# where the difficulty menu buttons are
+BUTTONS = {44: (350, 240), 50: (350, 340), 58: (350, 440), 64: (350, 540)}
+
+def play(scene, difficulty):
+    # from the difficulty menu, starts a game, makes a move and clicks New Game, returns the new difficulty menu
+    scene = mainMenu.step(scene, [click(BUTTONS[difficulty])])
+    board = scene.board
+    blank = divmod(board.model.values.index(0), 9)
+    digit = board.solution[blank[0]*9 + blank[1]]
+    scene = mainMenu.step(scene, [click((blank[1]*60 + 30, blank[0]*60 + 30)), key(pygame.K_0 + digit)])
+    scene = mainMenu.step(scene, [key(pygame.K_RETURN)])
+    scene = mainMenu.step(scene, [])
+    return mainMenu.step(scene, [click((300, 565))]) # New Game
+
+def rss():
+    # resident memory in bytes, linux only
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="plays many games in a row and reports memory use")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--difficulty", type=int, default=44, choices=sorted(BUTTONS))
+    parser.add_argument("--every", type=int, default=250, help="games between memory samples")
+    parser.add_argument("--warmup", type=int, default=100, help="games before the baseline sample")
+    parser.add_argument("--limit", type=float, default=1.0, help="allowed growth in MB of traced memory")
+    args = parser.parse_args()
+
+    pygame.init()
+    tracemalloc.start()
+    scene = mainMenu.DiffMenu()
+    scene.enter()
+    base = None
+    start = time.time()
+    for n in range(1, args.games + 1):
+        scene = play(scene, args.difficulty)
+        if n == args.warmup or n % args.every == 0 or n == args.games:
+            gc.collect()
+            traced = tracemalloc.get_traced_memory()[0]
+            if n >= args.warmup and base is None:
+                base = traced
+            print("games %6d  traced %8.1f KB  rss %8.1f MB  %.1f games/s" % (n, traced / 1024, rss() / 2**20, n / (time.time() - start)))
+    growth = (traced - base) / 2**20
+    pygame.quit()
+    print("growth after warmup: %.3f MB" % growth)
+    if growth > args.limit:
+        print("FAIL: memory grew by more than %.1f MB" % args.limit)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
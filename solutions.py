@@ -0,0 +1,150 @@
+import os, sys, time, argparse
+from collections import deque
+from multiprocessing import Pool
+
+"""
+counts or lists every solution of a grid, up to a cap, with the search tree spread over a process pool
+the tree is expanded breadth first at its first few branching cells (with the bitmask solver) until there are enough
+independent subproblems, about 8 per worker; each worker searches its subproblems to the end with the dancing links
+solver in dlx.py, which enumerates about 5 times faster than the bitmask one because it doesn't copy state per node;
+results are merged in search order, so the solutions listed and the count under a cap are the same whatever the
+number of workers; subproblems go out a few per worker at a time, each asked only for the solutions still missing
+python solutions.py <81 digit grid> --cap 100000         counts solutions and reports nodes per second
+python solutions.py <81 digit grid> --cap 20 --list      prints them too
+"""
+
+from solver import load, propagate, pick, DIGITS, ROW, COL, BOX
+import dlx
+
+def children(state):
+    # states below state, one per candidate of its most constrained cell, state must still have a blank
+    i, cand = pick(state)
+    cells, rows, cols, boxes = state
+    r, c, b = ROW[i], COL[i], BOX[i]
+    out = []
+    for d in DIGITS[cand]:
+        bit = 1 << (d-1)
+        child = [cells[:], rows[:], cols[:], boxes[:]]
+        child[0][i] = d
+        child[1][r] |= bit
+        child[2][c] |= bit
+        child[3][b] |= bit
+        out.append(child)
+    return out
+
+def split(grid, parts):
+    # (subproblems as flat cell lists, nodes expanded) with at least parts subproblems if the tree is that wide
+    state = load(grid)
+    if state is None:
+        return [], 0
+    frontier = [state]
+    nodes = 0
+    while len(frontier) < parts:
+        deeper = []
+        grew = False
+        for state in frontier:
+            nodes += 1
+            if not propagate(state):
+                continue # dead end, dropped
+            if pick(state) is None:
+                deeper.append(state) # already solved, stays a subproblem of its own
+                continue
+            deeper.extend(children(state))
+            grew = True
+        frontier = deeper
+        if not grew:
+            break # every subproblem is solved or dead, nothing left to split
+    return [state[0] for state in frontier], nodes
+
+def subproblem(task):
+    # worker, searches one subproblem, returns (solutions, nodes, solved grids as 81 bytes or None)
+    cells, cap, listing = task
+    links = dlx.load(cells, 3)
+    if links is None:
+        return 0, 0, [] if listing else None
+    rows = [] if listing else None
+    found, first, nodes = dlx.search(links, cap, sink=rows)
+    if not listing:
+        return found, nodes, None
+    return found, nodes, [bytes(dlx.rows_to_grid(cells, links, r, 3)) for r in rows]
+
+def search(grid, cap, workers=None, listing=False):
+    # (solutions up to cap, list of solved grids or None, stats) of a 9x9 grid or 81 flat digits
+    # stats has nodes, seconds, nodes_per_s, subproblems, workers and capped; workers=0 searches in this process
+    # capped is True only if the search stopped with solutions left over, so it looks for one solution past the cap
+    start = time.perf_counter()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parts, nodes = split(grid, 8 * max(1, workers))
+    total = 0
+    grids = [] if listing else None
+
+    def task(cells):
+        # a subproblem is only asked for the solutions still missing, one past the cap to tell if any are left over
+        return cells, cap + 1 - total, listing
+
+    def merge(result):
+        nonlocal total, nodes
+        n, visited, sink = result
+        nodes += visited
+        if listing:
+            grids.extend(sink[:cap - len(grids)])
+        total = min(cap + 1, total + n)
+        return total > cap
+
+    if workers == 0:
+        for cells in parts:
+            if merge(subproblem(task(cells))):
+                break
+    else:
+        # a few subproblems in flight per worker, each one submitted with what was still missing when it went out;
+        # leaving the block terminates workers still searching once the cap is reached
+        window = 2 * workers
+        with Pool(workers) as pool:
+            pending = deque() # subproblems being searched, oldest first so they merge in search order
+            capped = False
+            for cells in parts:
+                if len(pending) >= window:
+                    capped = merge(pending.popleft().get())
+                    if capped:
+                        break
+                pending.append(pool.apply_async(subproblem, (task(cells),)))
+            while pending and not capped:
+                capped = merge(pending.popleft().get())
+    seconds = time.perf_counter() - start
+    stats = {"nodes": nodes, "seconds": seconds, "nodes_per_s": nodes / seconds if seconds else 0.0,
+             "subproblems": len(parts), "workers": workers, "capped": total > cap}
+    return min(total, cap), grids, stats
+
+def count(grid, cap=10**6, workers=None):
+    # (number of solutions up to cap, stats)
+    total, grids, stats = search(grid, cap, workers)
+    return total, stats
+
+def enumerate_solutions(grid, cap=1000, workers=None):
+    # (list of up to cap solutions as 9x9 lists, stats)
+    total, grids, stats = search(grid, cap, workers, listing=True)
+    return [[list(g[r*9:r*9 + 9]) for r in range(9)] for g in grids], stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="count or list the solutions of a grid across a process pool")
+    parser.add_argument("grid", help="81 characters, 0 or . for blanks, - reads a line from stdin")
+    parser.add_argument("--cap", type=int, default=10**6, help="stop after this many solutions")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 searches in this process")
+    parser.add_argument("--list", action="store_true", help="print the solutions, one per line")
+    args = parser.parse_args(argv)
+
+    text = (sys.stdin.readline() if args.grid == "-" else args.grid).strip().replace(".", "0")
+    if len(text) != 81 or not text.isdigit():
+        parser.error("grid must be 81 digits")
+    total, grids, stats = search([int(c) for c in text], args.cap, args.workers, args.list)
+    if args.list:
+        for g in grids:
+            print("".join(str(d) for d in g))
+    print("%d%s solutions, %d nodes in %.2f s, %.0f nodes/s, %d subproblems on %d workers" % (
+        total, "+" if stats["capped"] else "", stats["nodes"], stats["seconds"], stats["nodes_per_s"],
+        stats["subproblems"], stats["workers"]), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+import instrument # off unless SUDOKU_INSTRUMENT is set, see instrument.py
+
+"""
+bitmask constraint propagation solver used by sudokuGen.py and mainMenu.py
+"""
+
+# every cell of the board is addressed by a flat index 0-80 (row*9 + col)
+# each row, column and box keeps a 9 bit mask of the digits already used in it, bit d-1 is set when d is used
+ALL = 0x1FF # all nine digits
+
+ROW = [i // 9 for i in range(81)]
+COL = [i % 9 for i in range(81)]
+BOX = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+
+# the 27 units (9 rows, 9 columns, 9 boxes) as lists of flat indexes, used for hidden singles
+UNITS = ([[r*9 + c for c in range(9)] for r in range(9)] +
+         [[r*9 + c for r in range(9)] for c in range(9)] +
+         [[i for i in range(81) if BOX[i] == b] for b in range(9)])
+
+# lookup tables so we never loop over bits in the hot path
+COUNT = [bin(m).count("1") for m in range(512)] # number of candidates in a mask
+DIGITS = [[d for d in range(1, 10) if m & (1 << (d-1))] for m in range(512)] # digits in a mask
+DIGIT = {1 << (d-1): d for d in range(1, 10)} # single bit -> digit
+
+
+def load(grid):
+    # builds the solver state from a 9x9 grid or a flat sequence of 81 digits, returns None if the givens already clash
+    if len(grid) == 81:
+        cells = list(grid)
+    else:
+        cells = [grid[i // 9][i % 9] for i in range(81)]
+    rows = [0]*9
+    cols = [0]*9
+    boxes = [0]*9
+    for i in range(81):
+        d = cells[i]
+        if d:
+            bit = 1 << (d-1)
+            if (rows[ROW[i]] | cols[COL[i]] | boxes[BOX[i]]) & bit:
+                return None # same digit twice in a row, column or box
+            rows[ROW[i]] |= bit
+            cols[COL[i]] |= bit
+            boxes[BOX[i]] |= bit
+    return [cells, rows, cols, boxes]
+
+
+def propagate(state):
+    # places naked and hidden singles until nothing changes, returns False on a contradiction
+    cells, rows, cols, boxes = state
+    changed = True
+    while changed:
+        changed = False
+        # naked singles, cells with only one candidate left
+        for i in range(81):
+            if cells[i] == 0:
+                r, c, b = ROW[i], COL[i], BOX[i]
+                cand = ALL & ~(rows[r] | cols[c] | boxes[b])
+                if not cand:
+                    return False # no digit fits in this cell
+                if not cand & (cand-1):
+                    cells[i] = DIGIT[cand]
+                    rows[r] |= cand
+                    cols[c] |= cand
+                    boxes[b] |= cand
+                    changed = True
+        # hidden singles, digits that fit in only one cell of a unit
+        for unit in UNITS:
+            once = 0
+            twice = 0
+            placed = 0
+            for i in unit:
+                d = cells[i]
+                if d:
+                    placed |= 1 << (d-1)
+                else:
+                    cand = ALL & ~(rows[ROW[i]] | cols[COL[i]] | boxes[BOX[i]])
+                    twice |= once & cand
+                    once |= cand
+            if (once | placed) != ALL:
+                return False # some digit has nowhere to go in this unit
+            hidden = once & ~twice & ~placed
+            if hidden:
+                for i in unit:
+                    if cells[i] == 0:
+                        r, c, b = ROW[i], COL[i], BOX[i]
+                        bit = hidden & ~(rows[r] | cols[c] | boxes[b])
+                        if bit:
+                            if bit & (bit-1):
+                                return False # one cell is the only home of two digits
+                            cells[i] = DIGIT[bit]
+                            rows[r] |= bit
+                            cols[c] |= bit
+                            boxes[b] |= bit
+                            changed = True
+    return True
+
+
+def pick(state):
+    # returns (index, candidates) of the empty cell with the fewest candidates (MRV), or None if the board is full
+    cells, rows, cols, boxes = state
+    best = None
+    fewest = 10
+    for i in range(81):
+        if cells[i] == 0:
+            cand = ALL & ~(rows[ROW[i]] | cols[COL[i]] | boxes[BOX[i]])
+            n = COUNT[cand]
+            if n < fewest:
+                best = (i, cand)
+                fewest = n
+                if n <= 2:
+                    break # can't do better than two after propagation
+    return best
+
+
+@instrument.nodes("solver.search")
+def search(state, rng=None):
+    # propagates, then branches on the most constrained cell, returns the solved flat list or None
+    if not propagate(state):
+        return None
+    found = pick(state)
+    if found is None:
+        return state[0] # no blank cells left
+    i, cand = found
+    digits = DIGITS[cand]
+    if rng is not None:
+        digits = rng.sample(digits, len(digits)) # randomizes board
+    cells, rows, cols, boxes = state
+    r, c, b = ROW[i], COL[i], BOX[i]
+    for d in digits:
+        bit = 1 << (d-1)
+        child = [cells[:], rows[:], cols[:], boxes[:]] # 120 ints, cheaper than undoing propagation
+        child[0][i] = d
+        child[1][r] |= bit
+        child[2][c] |= bit
+        child[3][b] |= bit
+        result = search(child, rng)
+        if result is not None:
+            return result
+    return None
+
+
+def fast_solve(grid, rng=None):
+    # pure function, returns a solved copy of grid or None if it has no solution; grid is never modified
+    # pass a random.Random (or the random module) as rng to get a random solution, used to build new boards
+    state = load(grid)
+    if state is None:
+        return None
+    cells = search(state, rng)
+    if cells is None:
+        return None
+    return [cells[r*9:r*9 + 9] for r in range(9)]
+
+
+@instrument.nodes("solver.count")
+def count(state, limit, first=None):
+    # counts solutions below state, stops as soon as limit is reached
+    # if first is a list the cells of the first solution found are appended to it
+    if not propagate(state):
+        return 0
+    found = pick(state)
+    if found is None:
+        if first is not None and not first:
+            first.append(state[0])
+        return 1
+    i, cand = found
+    cells, rows, cols, boxes = state
+    r, c, b = ROW[i], COL[i], BOX[i]
+    total = 0
+    for d in DIGITS[cand]:
+        bit = 1 << (d-1)
+        child = [cells[:], rows[:], cols[:], boxes[:]]
+        child[0][i] = d
+        child[1][r] |= bit
+        child[2][c] |= bit
+        child[3][b] |= bit
+        total += count(child, limit - total, first)
+        if total >= limit:
+            break # early exit, we only care whether there are at least limit solutions
+    return total
+
+
+def count_solutions(grid, limit=2):
+    # returns the number of solutions of grid, capped at limit; count_solutions(grid) == 1 means the puzzle is unique
+    state = load(grid)
+    if state is None:
+        return 0
+    return count(state, limit)
+
+
+def solve_steps(cells):
+    # generator version of the search used to animate solving, solves cells (a flat bytearray or list of 81 digits) in place
+    # yields the index of each cell it changes, cells[index] is the digit tried or 0 when it was taken back
+    # no propagation so every placement can be shown, the board is solved when the generator runs out on a full board
+    state = load(cells)
+    if state is None:
+        return
+    state[0] = cells # search directly on the caller's cells, nothing is copied per step
+    yield from steps(state)
+
+
+def pick_step(state):
+    # like pick, but only stops early at a cell with 0 or 1 candidates; pick's stop at 2 counts on propagation having
+    # filled the singles and found the dead ends, steps doesn't propagate so it has to look at every cell
+    cells, rows, cols, boxes = state
+    best = None
+    fewest = 10
+    for i in range(81):
+        if cells[i] == 0:
+            cand = ALL & ~(rows[ROW[i]] | cols[COL[i]] | boxes[BOX[i]])
+            n = COUNT[cand]
+            if n < fewest:
+                best = (i, cand)
+                fewest = n
+                if n <= 1:
+                    break # a forced cell or a dead end, nothing is better
+    return best
+
+
+def steps(state):
+    # backtracks on the most constrained cell, returns True once the board is full
+    found = pick_step(state)
+    if found is None:
+        return True
+    i, cand = found
+    cells, rows, cols, boxes = state
+    r, c, b = ROW[i], COL[i], BOX[i]
+    for d in DIGITS[cand]:
+        bit = 1 << (d-1)
+        cells[i] = d
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+        yield i
+        if (yield from steps(state)):
+            return True
+        cells[i] = 0 # d fits but the rest of the board doesn't, take it back
+        rows[r] &= ~bit
+        cols[c] &= ~bit
+        boxes[b] &= ~bit
+        yield i
+    return False
+
+
+def solve_unique(grid):
+    # one search for both the solution and whether it is the only one
+    # returns (solved copy of grid or None, number of solutions capped at 2)
+    state = load(grid)
+    if state is None:
+        return None, 0
+    first = []
+    n = count(state, 2, first)
+    if not first:
+        return None, n
+    cells = first[0]
+    return [cells[r*9:r*9 + 9] for r in range(9)], n
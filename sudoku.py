@@ -0,0 +1,38 @@
+import argparse, os, sys, time
+
+"""
+entry point, starts the pygame game; pygame and the front end are only imported once we know we need them
+"""
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cam's Sudoku")
+    parser.add_argument("--fps", type=int, default=60, help="frame rate cap while the solver is animating")
+    parser.add_argument("--frame-stats", action="store_true", help="print frame time and idle percentage on exit")
+    parser.add_argument("--bank", default=os.environ.get("SUDOKU_BANK"), help="puzzle bank made by puzzleBank.py build, boards are dealt from it (default $SUDOKU_BANK)")
+    parser.add_argument("--import-time", action="store_true", help="print how long the headless core and the front end take to import, then exit")
+    parser.add_argument("--instrument", metavar="JSON", help="count solver nodes, generation and placement times and frame times, written to JSON on exit (same as $SUDOKU_INSTRUMENT)")
+    parser.add_argument("--profile", metavar="PSTATS", help="cProfile the session into a pstats file (same as $SUDOKU_PROFILE)")
+    args = parser.parse_args(argv)
+
+    # instrument.py reads these when it is first imported, so they have to be set before the game modules load
+    if args.instrument:
+        os.environ["SUDOKU_INSTRUMENT"] = args.instrument
+    if args.profile:
+        os.environ["SUDOKU_PROFILE"] = args.profile
+
+    if args.import_time:
+        start = time.perf_counter()
+        import sudokuCore
+        core = time.perf_counter() - start
+        start = time.perf_counter()
+        import mainMenu
+        front = time.perf_counter() - start
+        print("sudokuCore %.1f ms, mainMenu (pygame front end) %.1f ms" % (core * 1000, front * 1000))
+        return 0
+
+    import mainMenu # loads pygame
+    mainMenu.main(args.fps, args.frame_stats, args.bank)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+headless sudoku core: board model, solver, generator and validator, no pygame needed
+import this from batch jobs, tests and servers, the pygame front end is started by sudoku.py
+"""
+
+from board import Board, Cell # compact board model
+from solver import fast_solve, count_solutions, solve_steps # bitmask solver
+from sudokuGen import make_puzzle, make_graded, maker, solution, solve, solve_backtrack # generator
+from rating import rate, grade # difficulty rating
+
+def find_empty(bo):
+    # iterates through board and returns (x,y) of first blank space
+    for i in range(len(bo)):
+        for j in range(len(bo[0])):
+            if bo[i][j] == 0:
+                return (i, j)  # row, col
+
+    return None
+
+def valid(bo, num, pos):
+    # checks for all validity
+    # check row
+    for i in range(len(bo[0])):
+        if bo[pos[0]][i] == num and pos[1] != i:
+            return False
+
+    # check column
+    for i in range(len(bo)):
+        if bo[i][pos[1]] == num and pos[0] != i:
+            return False
+
+    # check box
+    b = int(round(len(bo) ** 0.5)) # box width, 3 on a 9x9 board
+    box_x = pos[1] // b
+    box_y = pos[0] // b
+
+    for i in range(box_y*b, box_y*b + b):
+        for j in range(box_x * b, box_x*b + b):
+            if bo[i][j] == num and (i,j) != pos:
+                return False
+
+    return True # if it gets to this point it must be valid
+
+def validate(bo, complete=False):
+    # checks a whole 9x9 board, True if no digit repeats in a row, column or box (and no blanks if complete)
+    for i in range(9):
+        for j in range(9):
+            num = bo[i][j]
+            if num == 0:
+                if complete:
+                    return False
+            elif not (1 <= num <= 9) or not valid(bo, num, (i, j)):
+                return False
+    return True
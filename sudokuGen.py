@@ -1,15 +1,25 @@
-import pygame, sys, random
+import sys, random, time
 from random import sample
 from copy import deepcopy
+from solver import fast_solve, count_solutions # bitmask solver, see solver.py
+from rating import rate, grade, GRADES # technique based difficulty, see rating.py
+import instrument # off unless SUDOKU_INSTRUMENT is set
 
 """
 formats and creates solved sudoku boards of varying difficulty
 """
 
-pygame.font.init() # initializing the constructor 
-
 def solve(grid):
-    # recursive backtracking algorithm 
+    # fills grid in place with a random solution, returns True if one was found
+    sol = fast_solve(grid, random)
+    if sol is None:
+        return False
+    for i in range(9):
+        grid[i][:] = sol[i]
+    return True
+
+def solve_backtrack(grid):
+    # original recursive backtracking algorithm, kept as a reference to check the fast solver against
     find = is_empty(grid)
     if not find:  # if it cannot find a blank space then the board must be solved
         return True # board is solved
@@ -17,11 +27,10 @@ def solve(grid):
         row, col = find # find is (x,y)
     
     for i in range(1,10):
-        i = random.sample(range(1,10),1)[0] # randomizes board
         if check(grid, i, (row, col)): # iterates through board and attemps to place i. 
             grid[row][col] = i # if valid, set tile to that value
             
-            if solve(grid): # starts recursion, will return True when there are no more spaces to find
+            if solve_backtrack(grid): # starts recursion, will return True when there are no more spaces to find
                 return True # ends recursion, solve will only return True when it cannot find an blank space
             
             grid[row][col] = 0 # i is valid but solve is False, set to 0
@@ -43,23 +52,122 @@ def is_empty(grid):
                 return (i, j) # if it's empty return (x,y) of empty tile
     return None
 
-def solution():
-    # makes empty grid, then returns solved grid
-    grid = [[0 for n in range(9)] for m in range(9)] # produces empty grid (9x9 2D array containing only zeros)
-    solve(grid) # which is then passed to the solve method to create a solved grid
+def solution(seed=None, rng=None):
+    # returns a random solved grid, the same seed always gives the same grid
+    if rng is None:
+        rng = random if seed is None else random.Random(seed)
+    return full_grid(rng)
+
+def full_grid(rng=random):
+    # random solved grid, a search of the empty board with rng picking the order digits are tried in
+    # the search is what gives grids of every kind, shuffling alone keeps a grid in its symmetry class; the moves
+    # below (swapping bands and rows inside a band, the same for stacks and columns, transposing, relabeling the
+    # digits) keep a grid valid and cost next to nothing, so they go on top
+    base = fast_solve([[0] * 9 for r in range(9)], rng)
+    rows = [band*3 + r for band in rng.sample(range(3), 3) for r in rng.sample(range(3), 3)]
+    cols = [stack*3 + c for stack in rng.sample(range(3), 3) for c in rng.sample(range(3), 3)]
+    digits = [0] + rng.sample(range(1, 10), 9)
+    grid = [[digits[base[r][c]] for c in cols] for r in rows]
+    if rng.random() < 0.5:
+        grid = [list(col) for col in zip(*grid)] # transpose
     return grid
 
-def maker(diff):
-    # used in mainMenu.py, starts the process of creating a board 
-    sol = solution() # starts with an empty grid then solves it
+def maker(diff, unique=True, seed=None):
+    # starts the process of creating a board, the game now calls make_puzzle directly, which also returns its stats
+    if unique:
+        puzzle, sol, stats = make_puzzle(diff, seed=seed)
+        return [puzzle]
+
+    rng = random if seed is None else random.Random(seed)
+    sol = solution(rng=rng) # starts with a random solved grid
     puzzle = deepcopy(sol) # creates a copy
   
-    for i in sample(range(81), diff): # we then iterate through the array diff amount of times, then i is set to a random number from 1-81
+    for i in rng.sample(range(81), diff): # we then iterate through the array diff amount of times, then i is set to a random number from 1-81
         puzzle[i//9][i%9] = 0 # we then set i to zero so that the board is now incomplete 
     
-    # starts with empty 9x9 grid, randomizes and solves it, then randomly sets tiles to zero (amount of tiles is decided by difficulty), creating a new, random board ready for sudoku
+    # starts with a random solved grid, then randomly sets tiles to zero (amount of tiles is decided by difficulty), creating a new, random board ready for sudoku
     return [puzzle] 
 
+def make_puzzle(diff, attempts=8, budget=0.5, seed=None):
+    # makes a board with diff blanks that has exactly one solution, returns (puzzle, solution, stats)
+    # pass seed to get the same board every time (as long as budget isn't what stops the search, budget=None turns it off)
+    # clues are removed one at a time in random order and a removal is only kept if the board stays unique
+    # removing clues one by one gets stuck around 58 blanks (23 clues), a little more with luck, never near 64 (17 clues,
+    # make_level serves that level by rating instead), so we retry with a fresh solution up to attempts times or until budget seconds are used, and keep the board with
+    # the most blanks; stats["blanks"] says what was reached
+    start = time.perf_counter()
+    rng = random if seed is None else random.Random(seed)
+    best = None
+    checks = 0
+    for attempt in range(1, attempts + 1):
+        sol = solution(rng=rng)
+        puzzle = deepcopy(sol)
+        blanks = 0
+        for i in rng.sample(range(81), 81):
+            if blanks == diff:
+                break
+            puzzle[i//9][i%9] = 0
+            checks += 1
+            if count_solutions(puzzle, 2) == 1: # stops at the second solution
+                blanks += 1
+            else:
+                puzzle[i//9][i%9] = sol[i//9][i%9] # removing this clue made the board ambiguous, put it back
+        if best is None or blanks > best[2]:
+            best = (puzzle, sol, blanks)
+        if blanks == diff or (budget is not None and time.perf_counter() - start > budget):
+            break
+
+    puzzle, sol, blanks = best
+    score, steps = rate(puzzle)
+    stats = {
+        "blanks": blanks, # may be less than diff if no unique board was found in time
+        "requested": diff,
+        "attempts": attempt,
+        "checks": checks, # number of uniqueness checks run
+        "score": score, # see rating.py
+        "grade": grade(score),
+        "seconds": time.perf_counter() - start,
+    }
+    if instrument.ENABLED:
+        instrument.generated(stats)
+    return puzzle, sol, stats
+
+GRADE_BLANKS = {"easy": 44, "medium": 50, "hard": 56, "expert": 58, "extreme": 58} # where make_graded starts looking
+
+def make_graded(want, tries=100, budget=2.0, seed=None):
+    # makes unique boards until one rates as grade want, returns (puzzle, solution, stats) like make_puzzle
+    # blanks go up after a board that was too easy and down after one that was too hard; if no board of the grade
+    # turns up within tries boards or budget seconds the closest one is returned, stats["grade"] says what it is
+    start = time.perf_counter()
+    rng = random if seed is None else random.Random(seed)
+    names = [name for name, top in GRADES]
+    target = names.index(want)
+    diff = GRADE_BLANKS[want]
+    best = None
+    for n in range(1, tries + 1):
+        puzzle, sol, stats = make_puzzle(diff, attempts=1, budget=None, seed=rng.getrandbits(64))
+        off = names.index(stats["grade"]) - target
+        if best is None or abs(off) < abs(best[3]):
+            best = (puzzle, sol, stats, off)
+        if off == 0 or (budget is not None and time.perf_counter() - start > budget):
+            break
+        diff = max(30, min(60, diff - 2 if off > 0 else diff + 2))
+    puzzle, sol, stats, off = best
+    stats["tries"] = n
+    stats["seconds"] = time.perf_counter() - start
+    return puzzle, sol, stats
+
+IMPOSSIBLE = 64 # the Impossible level of the menu, see make_level
+
+def make_level(diff, seed=None, timed=True):
+    # board for a level of the game (44, 50, 58 blanks or IMPOSSIBLE), returns (puzzle, solution, stats) like make_puzzle
+    # 64 blanks is out of reach of removing clues one by one, which stalls around 58, so Impossible is a board that
+    # rates "extreme" (can't be finished without guessing) instead, made by make_graded; stats["blanks"] says how
+    # many blanks it has; timed=False turns the time budgets off so the board only depends on seed
+    if diff == IMPOSSIBLE:
+        return make_graded("extreme", budget=2.0 if timed else None, seed=seed)
+    return make_puzzle(diff, budget=0.5 if timed else None, seed=seed)
+
 def format(puzzle):
     # formats the puzzle so it can be called in mainMenu.py
     newBoard = []
@@ -79,10 +187,11 @@ def column(grid, col):
     return [grid[i][col] for i in range(len(grid))]
 
 def block(grid, pos): 
-    box = (pos[0] // 3, pos[1] // 3)                           
+    b = int(round(len(grid) ** 0.5)) # box width, 3 on a 9x9 grid
+    box = (pos[0] // b, pos[1] // b)                           
     box_num = [
                 grid[i][j] 
-                for i in range(box[0]*3, box[0]*3 + 3) 
-                for j in range(box[1]*3, box[1]*3 + 3)
+                for i in range(box[0]*b, box[0]*b + b) 
+                for j in range(box[1]*b, box[1]*b + b)
                 ] 
     return box_num
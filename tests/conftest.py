@@ -0,0 +1,7 @@
+import os, sys
+
+"""
+the modules live at the top of the repository, next to this folder, so the tests import them from there
+"""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
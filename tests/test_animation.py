@@ -0,0 +1,51 @@
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no window needed
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from mainMenu import SolverAnimation, SPEEDS
+from board import Board
+from solver import fast_solve
+
+"""
+solver animation: each speed ends on the solution, Instant copies it in one frame, cancel puts the board back
+"""
+
+EASY = "000957001507400900210008700070820400160049007008000010600000003953286170780030009"
+
+def grid():
+    # stand-in for mainMenu.Grid, only what the animation uses
+    model = Board([int(c) for c in EASY])
+    return SimpleNamespace(model=model, box=3, solution=bytes(sum(fast_solve(model.grid()), [])))
+
+def test_instant_fills_in_one_frame():
+    board = grid()
+    animation = SolverAnimation(board, len(SPEEDS) - 1)
+    assert animation.run()
+    assert bytes(board.model.values) == board.solution
+    assert not any(board.model.highlight)
+
+def test_fastest_timed_speed_ends_on_the_solution():
+    board = grid()
+    animation = SolverAnimation(board, len(SPEEDS) - 2)
+    for frame in range(10**5):
+        animation.due = 0 # every step is due, no waiting between frames
+        if animation.run():
+            break
+    assert bytes(board.model.values) == board.solution
+
+def test_switching_to_instant_mid_search():
+    board = grid()
+    animation = SolverAnimation(board, 0)
+    animation.run()
+    animation.speed = len(SPEEDS) - 1
+    assert animation.run()
+    assert bytes(board.model.values) == board.solution
+
+def test_cancel_restores_the_board():
+    board = grid()
+    animation = SolverAnimation(board, 0)
+    animation.run()
+    animation.cancel()
+    assert bytes(board.model.values) == bytes(int(c) for c in EASY)
@@ -0,0 +1,66 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batchcheck import to_array, check, conflicts, candidates, load_text, load_bank, audit
+from batchgen import make_line, task_seed
+from corpus import CORPORA
+from puzzleBank import build
+from sudokuCore import validate
+
+"""
+numpy batch checks: every board gets the same answer as checking it on its own in python
+"""
+
+def boards(n, seed=4):
+    # corpus puzzles with random digits dropped in, so some are broken and some aren't
+    rng = random.Random(seed)
+    texts = [p for puzzles in CORPORA.values() for p in puzzles]
+    out = []
+    for k in range(n):
+        cells = [int(c) for c in rng.choice(texts)]
+        for j in range(rng.randrange(3)):
+            cells[rng.randrange(81)] = rng.randrange(10)
+        out.append(cells)
+    return out
+
+def slow_conflicts(cells, i):
+    # True if the digit of cell i appears again in its row, column or box
+    d = cells[i]
+    r, c = i // 9, i % 9
+    peers = [j for j in range(81) if j != i and (j // 9 == r or j % 9 == c or
+             (j // 27 == i // 27 and j % 9 // 3 == c // 3))]
+    return bool(d) and any(cells[j] == d for j in peers)
+
+def test_matches_python():
+    grids = boards(60)
+    arr = to_array(grids)
+    ok = check(arr)
+    clash = conflicts(arr).reshape(-1, 81)
+    cands = candidates(arr).reshape(-1, 81)
+    for k, cells in enumerate(grids):
+        grid = [cells[r*9:r*9 + 9] for r in range(9)]
+        assert ok[k] == validate(grid)
+        assert [bool(x) for x in clash[k]] == [slow_conflicts(cells, i) for i in range(81)]
+        for i in range(81):
+            if cells[i]:
+                assert cands[k][i] == 0
+            else:
+                free = [d for d in range(1, 10) if not slow_conflicts(cells[:i] + [d] + cells[i + 1:], i)]
+                assert cands[k][i] == sum(1 << (d - 1) for d in free)
+
+def test_text_and_bank_agree(tmp_path):
+    source = str(tmp_path / "bank.txt")
+    with open(source, "w") as f:
+        for diff in (44, 50):
+            for k in range(5):
+                f.write(make_line((diff, task_seed(0, diff, k))))
+    build([source], str(tmp_path / "p.bank"))
+    text = load_text(source)
+    bank = load_bank(str(tmp_path / "p.bank"))
+    assert (text[0] == bank[0]).all() and (text[1] == bank[1]).all()
+    assert audit(*text) == {"puzzle": 0, "solution": 0, "mismatch": 0, "stuck": 0}
+    broken = text[1].copy()
+    broken[0, 0, 0] = broken[0, 0, 1]
+    assert audit(text[0], broken)["solution"] == 1
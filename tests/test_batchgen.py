@@ -0,0 +1,51 @@
+from batchgen import main, parse_line, done_seeds, dropped_seeds, make_line, task_seed
+from solver import count_solutions
+
+"""
+batch generator: the same seeds give the same puzzles whatever the workers, a rerun only makes what is missing
+"""
+
+def puzzles(path):
+    # lines of a batchgen file without the timing, which changes from run to run
+    with open(path) as f:
+        return sorted(line.rsplit(" ms=", 1)[0] for line in f)
+
+def test_lines_round_trip():
+    line = make_line((44, task_seed(0, 44, 3)))
+    puzzle, sol, diff, stats = parse_line(line)
+    assert diff == 44 and int(stats["seed"]) == task_seed(0, 44, 3)
+    assert count_solutions([int(c) for c in puzzle]) == 1
+    assert parse_line("garbage") is None
+    assert parse_line(line[:100]) is None
+
+def test_resume_and_workers(tmp_path):
+    one = str(tmp_path / "one.txt")
+    two = str(tmp_path / "two.txt")
+    assert main([one, "--count", "4", "--difficulty", "44", "--difficulty", "50", "--workers", "1", "--quiet"]) == 0
+    assert main([two, "--count", "4", "--difficulty", "44", "--difficulty", "50", "--workers", "2", "--chunk", "1", "--quiet"]) == 0
+    assert puzzles(one) == puzzles(two)
+    assert len(done_seeds(one)) == 8
+
+    with open(two) as f:
+        data = f.read()
+    cut = data.rfind("\n", 0, len(data) - 1) + 1
+    with open(two, "w") as f:
+        f.write(data[:cut + 40]) # interrupted in the middle of the last line
+    assert len(done_seeds(two)) == 7
+    main([two, "--count", "4", "--difficulty", "44", "--difficulty", "50", "--workers", "1", "--quiet"])
+    assert puzzles(one) == puzzles(two)
+
+def test_dedup_remembers_dropped_seeds(tmp_path):
+    out = str(tmp_path / "out.txt")
+    seed = task_seed(0, 44, 1)
+    puzzle, sol, diff, stats = parse_line(make_line((44, seed)))
+    swap = lambda text: "".join(str(10 - int(c)) if c != "0" else "0" for c in text) # relabels every digit
+    with open(out, "w") as f:
+        f.write("%s %s 44 seed=1\n" % (swap(puzzle), swap(sol))) # a copy of the puzzle seed will make
+    assert main([out, "--count", "3", "--difficulty", "44", "--workers", "1", "--dedup", "--quiet"]) == 0
+    assert dropped_seeds(out) == {seed}
+    assert done_seeds(out) == {1, task_seed(0, 44, 0), task_seed(0, 44, 2)}
+    with open(out, "a") as f:
+        f.write("garbage\n")
+    main([out, "--count", "3", "--difficulty", "44", "--workers", "1", "--dedup", "--quiet"])
+    assert len(done_seeds(out)) == 3 # nothing was made again, the dropped seed included
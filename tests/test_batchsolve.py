@@ -0,0 +1,24 @@
+from batchsolve import main
+from corpus import EASY, HARDEST
+
+"""
+batch solver: results come out in input order whatever the number of workers and chunk size
+"""
+
+def run(tmp_path, lines, *args):
+    # output lines of batchsolve for input lines
+    src = tmp_path / "in.txt"
+    out = tmp_path / "out.txt"
+    src.write_text("".join(line + "\n" for line in lines))
+    main([str(src), "--out", str(out)] + list(args))
+    return out.read_text().splitlines()
+
+def test_order_and_status(tmp_path):
+    ambiguous = "0" * 81
+    clash = "11" + "0" * 79
+    lines = HARDEST + ["not a puzzle", ambiguous, clash] + EASY
+    inline = run(tmp_path, lines, "--workers", "0")
+    assert [line.split()[0] for line in inline[:len(HARDEST)]] == HARDEST
+    assert [line.split()[2] for line in inline[len(HARDEST):len(HARDEST) + 3]] == ["invalid", "multiple", "unsolvable"]
+    assert all(line.endswith("solved") for line in inline[len(HARDEST) + 3:])
+    assert run(tmp_path, lines, "--workers", "2", "--chunk", "3", "--window", "2") == inline
@@ -0,0 +1,24 @@
+from bench import compare, summary, main
+from corpus import CORPORA, parse
+from solver import count_solutions
+
+"""
+benchmark suite: the corpora are proper puzzles and slowdowns past the tolerance are flagged
+"""
+
+def test_corpora_are_unique():
+    for name, puzzles in CORPORA.items():
+        for line in puzzles:
+            assert count_solutions(parse(line)) == 1, name
+
+def test_compare_flags_regressions():
+    baseline = {"a": {"ms": 10.0}, "b": {"ms": 10.0}}
+    results = {"a": {"ms": 12.0}, "b": {"ms": 13.0}, "c": {"ms": 1.0}}
+    assert compare(results, baseline, 0.25) == ["b"]
+    assert summary([0.003, 0.001, 0.002])["ms"] == 2.0
+
+def test_save_then_compare(tmp_path):
+    base = str(tmp_path / "base.json")
+    out = str(tmp_path / "out.json")
+    assert main(["--quick", "--only", "solve", "--out", out, "--baseline", base, "--save-baseline"]) == 0
+    assert main(["--quick", "--only", "solve", "--out", out, "--baseline", base, "--tolerance", "1000"]) == 0
@@ -0,0 +1,47 @@
+import random
+from board import Board
+from solver import fast_solve
+
+"""
+board model: the masks and candidates kept up to date on every placement match a full rebuild
+"""
+
+EASY = "000957001507400900210008700070820400160049007008000010600000003953286170780030009"
+
+def test_masks_follow_moves():
+    rng = random.Random(3)
+    for box, text in ((3, EASY), (4, None), (5, None)):
+        n = box ** 4
+        board = Board([int(c) for c in text] if text else [0] * n, box)
+        for k in range(300):
+            i = rng.randrange(n)
+            if board.givens[i]:
+                continue
+            if board.values[i] and rng.random() < 0.4:
+                board.set(i, 0)
+            else:
+                legal = [d for d in range(1, board.size + 1) if d == board.values[i] or not board.conflicts(i, d)]
+                if legal:
+                    board.set(i, rng.choice(legal))
+            masks = (list(board.rows), list(board.cols), list(board.boxes), list(board.cands))
+            board.rebuild()
+            assert (list(board.rows), list(board.cols), list(board.boxes), list(board.cands)) == masks
+
+def test_conflicts_and_dirty():
+    board = Board([int(c) for c in EASY])
+    board.dirty[:] = bytes(81)
+    i = board.values.index(0)
+    assert board.conflicts(i, 9) # 9 is given in row 0
+    board.set(i, 2)
+    assert board.dirty[i] and board.values[i] == 2
+    assert board.grid()[0][0] == 2
+    assert not board.is_finished()
+
+def test_hints_follow_the_solution():
+    board = Board([int(c) for c in EASY])
+    sol = sum(fast_solve(board.grid()), [])
+    while not board.is_finished():
+        i, d, text = board.hint() # this puzzle needs nothing but singles
+        assert d == sol[i] and text
+        board.set(i, d)
+    assert board.hint() is None
@@ -0,0 +1,46 @@
+import random
+from canonical import canonical, invariant, DedupIndex
+from corpus import CORPORA
+
+"""
+canonical form and dedup index: every symmetric copy maps to the same form, different puzzles don't
+"""
+
+PUZZLES = [p for puzzles in CORPORA.values() for p in puzzles]
+
+def shuffled(text, rng):
+    # random symmetric copy of a puzzle: relabeled, rows and columns shuffled within bands and stacks, maybe transposed
+    cells = [int(c) for c in text]
+    rows = [b*3 + r for b in rng.sample(range(3), 3) for r in rng.sample(range(3), 3)]
+    cols = [s*3 + c for s in rng.sample(range(3), 3) for c in rng.sample(range(3), 3)]
+    labels = [0] + rng.sample(range(1, 10), 9)
+    out = [labels[cells[r*9 + c]] for r in rows for c in cols]
+    if rng.random() < 0.5:
+        out = [out[c*9 + r] for r in range(9) for c in range(9)]
+    return out
+
+def test_copies_share_form_and_key():
+    rng = random.Random(5)
+    for text in PUZZLES[:20]:
+        form = canonical(text)
+        key = invariant(text)
+        for k in range(3):
+            copy = shuffled(text, rng)
+            assert canonical(copy) == form
+            assert invariant(copy) == key
+
+def test_form_is_a_relabeled_layout():
+    form = canonical(PUZZLES[0])
+    assert len(form) == 81
+    assert form.count("0") == PUZZLES[0].count("0")
+
+def test_different_puzzles_differ():
+    assert len({canonical(p) for p in PUZZLES}) == len(PUZZLES)
+
+def test_index_drops_copies():
+    rng = random.Random(9)
+    index = DedupIndex()
+    assert all(index.add(p) for p in PUZZLES)
+    assert not any(index.add(shuffled(p, rng)) for p in PUZZLES)
+    assert len(index) == len(PUZZLES)
+    assert index.duplicates == len(PUZZLES)
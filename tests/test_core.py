@@ -0,0 +1,27 @@
+import os, sys, subprocess
+from sudokuCore import validate, find_empty, fast_solve
+
+"""
+headless core: imports without pygame and validates boards
+"""
+
+EASY = "000957001507400900210008700070820400160049007008000010600000003953286170780030009"
+
+def grid(text):
+    # 9x9 list from an 81 character puzzle
+    return [[int(c) for c in text[r*9:r*9 + 9]] for r in range(9)]
+
+def test_no_pygame():
+    # in a fresh interpreter, other tests may have loaded pygame into this one
+    code = "import sys, sudokuCore; sys.exit('pygame' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
+
+def test_validate():
+    puzzle = grid(EASY)
+    assert validate(puzzle) and not validate(puzzle, complete=True)
+    assert find_empty(puzzle) == (0, 0)
+    sol = fast_solve(puzzle)
+    assert validate(sol, complete=True) and find_empty(sol) is None
+    sol[0][0], sol[0][1] = sol[0][1], sol[0][0]
+    assert not validate(sol) # the row is still fine, the columns now clash
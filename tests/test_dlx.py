@@ -0,0 +1,51 @@
+import random
+import dlx
+from corpus import CORPORA
+from solver import fast_solve, count_solutions
+from canonical import canonical
+
+"""
+dancing links solver and generator: agrees with the bitmask solver on 9x9 and makes unique 16x16 and 25x25 boards
+"""
+
+def solved(grid, box):
+    # True if every row, column and box of a flat full grid holds 1 to n
+    n = box * box
+    ROW, COL, BOX = dlx.geometry(box)
+    full = list(range(1, n + 1))
+    return all(sorted(grid[i] for i in range(n*n) if where[i] == k) == full
+               for where in (ROW, COL, BOX) for k in range(n))
+
+def test_agrees_with_bitmask_solver():
+    for puzzles in CORPORA.values():
+        for text in puzzles:
+            cells = [int(c) for c in text]
+            sol = fast_solve(cells)
+            assert dlx.solve(cells, 3) == [d for row in sol for d in row]
+            assert dlx.count_solutions(cells, 3) == 1
+    empty = [0] * 81
+    assert dlx.count_solutions(empty, 3, 7) == 7 == count_solutions(empty, 7)
+    empty[0] = empty[5] = 7
+    assert dlx.solve(empty, 3) is None and dlx.count_solutions(empty, 3) == 0
+
+def test_solve_leaves_its_input_alone():
+    cells = [int(c) for c in CORPORA["hardest"][0]]
+    before = list(cells)
+    dlx.solve(cells, 3, random.Random(1))
+    assert cells == before
+
+def test_full_grids():
+    for box in (3, 4, 5):
+        grid = dlx.full_grid(box, random.Random(box))
+        assert solved(grid, box)
+    assert len({canonical(dlx.full_grid(3, random.Random(seed))) for seed in range(4)}) == 4 # not one grid shuffled
+
+def test_big_puzzles_are_unique():
+    for box, blanks in ((4, 140), (5, 281)):
+        puzzle, sol, stats = dlx.make_puzzle(box, blanks, seed=box)
+        assert stats["blanks"] == puzzle.count(0) == blanks
+        assert solved(sol, box)
+        assert all(p in (0, s) for p, s in zip(puzzle, sol))
+        assert dlx.count_solutions(puzzle, box) == 1
+        assert dlx.solve(puzzle, box) == sol
+    assert dlx.make_puzzle(4, 100, seed=9)[0] == dlx.make_puzzle(4, 100, seed=9)[0]
@@ -0,0 +1,55 @@
+from sudokuGen import make_puzzle, make_graded, make_level, solution, IMPOSSIBLE
+from rating import GRADES
+from canonical import canonical
+from solver import count_solutions
+
+"""
+generator: boards are unique, keep the solution's digits and report how many blanks they really have, seeds repeat
+"""
+
+def test_count_stops_at_limit():
+    empty = [[0] * 9 for r in range(9)]
+    assert count_solutions(empty) == 2
+    assert count_solutions(empty, 50) == 50
+    empty[0][0] = empty[0][5] = 7
+    assert count_solutions(empty) == 0
+
+def test_unique_and_consistent():
+    for diff in (44, 50):
+        puzzle, sol, stats = make_puzzle(diff)
+        assert count_solutions(puzzle) == 1
+        assert all(puzzle[r][c] in (0, sol[r][c]) for r in range(9) for c in range(9))
+        assert stats["blanks"] == sum(row.count(0) for row in puzzle) <= diff
+        assert stats["requested"] == diff
+        assert stats["grade"] in [name for name, top in GRADES]
+
+def test_solutions_are_valid_and_seeded():
+    for seed in range(20):
+        sol = solution(seed)
+        units = ([sol[r] for r in range(9)] + [[sol[r][c] for r in range(9)] for c in range(9)] +
+                 [[sol[r][c] for r in range(b//3*3, b//3*3 + 3) for c in range(b%3*3, b%3*3 + 3)] for b in range(9)])
+        assert all(sorted(unit) == list(range(1, 10)) for unit in units)
+        assert solution(seed) == sol
+    assert solution(1) != solution(2)
+
+def test_same_seed_same_board():
+    first = make_puzzle(50, seed=7, budget=60)
+    again = make_puzzle(50, seed=7, budget=60)
+    assert first[0] == again[0] and first[1] == again[1]
+    assert make_puzzle(50, seed=1, budget=60)[0] != make_puzzle(50, seed=2, budget=60)[0]
+
+def test_make_graded():
+    puzzle, sol, stats = make_graded("easy", seed=3, budget=None)
+    assert stats["grade"] == "easy" and count_solutions(puzzle) == 1
+
+def test_solutions_are_not_all_one_grid():
+    # shuffling alone would give copies of one grid, a search gives grids that are really different
+    forms = {canonical(solution(seed)) for seed in range(4)}
+    assert len(forms) == 4
+
+def test_impossible_needs_guessing():
+    for seed in range(3):
+        puzzle, sol, stats = make_level(IMPOSSIBLE, seed=seed, timed=False)
+        assert stats["grade"] == "extreme" and count_solutions(puzzle) == 1
+        assert stats["blanks"] == sum(row.count(0) for row in puzzle)
+    assert make_level(58, seed=1, timed=False)[0] == make_puzzle(58, seed=1, budget=None)[0]
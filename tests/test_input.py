@@ -0,0 +1,36 @@
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no window needed
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from mainMenu import Game
+
+"""
+number keys: on big boards a second digit joins the first while the number still fits the board
+"""
+
+def typing(size, digits):
+    # key after typing digits on a board of size symbols
+    game = SimpleNamespace(size=size, key=None, typing=0)
+    for d in digits:
+        Game.typed(game, d)
+    return game.key
+
+def test_nine_by_nine_takes_one_digit():
+    assert typing(9, [5]) == 5
+    assert typing(9, [1, 6]) == 6
+    assert typing(9, [3, 0]) == 3
+
+def test_two_digit_symbols():
+    assert typing(16, [1, 6]) == 16
+    assert typing(16, [1, 0]) == 10
+    assert typing(16, [2, 5]) == 5
+    assert typing(25, [2, 5]) == 25
+    assert typing(25, [2, 6]) == 6
+
+def test_a_full_number_starts_over():
+    assert typing(16, [1, 6, 1]) == 1 # 16 can't grow, the next digit is a new number
+    assert typing(16, [1, 6, 1, 2]) == 12
+    assert typing(25, [3, 1]) == 1
+    assert typing(16, [0, 5]) == 5
@@ -0,0 +1,44 @@
+import os, sys, json, subprocess
+import instrument
+from instrument import Histogram
+
+"""
+instrumentation: nothing is wrapped when it is off, counters and histograms reach the JSON file when it is on
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_off_hands_back_the_function():
+    if instrument.ENABLED:
+        return # the suite itself is being instrumented
+    def f(x):
+        return x
+    assert instrument.timed("f")(f) is f
+    assert instrument.nodes("f")(f) is f
+
+def test_histogram():
+    h = Histogram()
+    for ms in (0.5, 0.5, 0.5, 3, 40):
+        h.add(ms / 1000)
+    assert h.n == 5 and abs(h.total - 44.5) < 1e-9 and h.worst == 40
+    assert h.percentile(50) == 0.5
+    assert h.percentile(100) == 40 # the bucket goes up to 50, nothing took that long
+    one = Histogram()
+    one.add(0.0013)
+    assert one.percentile(50) == one.percentile(99) == one.worst # 1.3 ms, not the 2 ms edge of its bucket
+    summary = h.summary()
+    assert summary["count"] == 5 and summary["buckets_ms"] == {"<=0.5": 3, "<=5": 1, "<=50": 1}
+
+def test_report_written_on_exit(tmp_path):
+    path = str(tmp_path / "stats.json")
+    code = "import sudokuGen; sudokuGen.make_puzzle(44, seed=1, budget=None)"
+    env = dict(os.environ, SUDOKU_INSTRUMENT=path)
+    env.pop("SUDOKU_INSTRUMENT_PID", None)
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True)
+    with open(path) as f:
+        report = json.load(f)
+    counters = report["counters"]
+    assert counters["generate.boards"] == 1
+    assert counters["solver.count.nodes"] >= counters["generate.checks"] > 0
+    assert report["timings"]["generate"]["count"] == 1
+    assert report["timings"]["rate"]["count"] == 1
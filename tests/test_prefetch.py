@@ -0,0 +1,58 @@
+import time, threading
+from concurrent.futures import CancelledError
+import dlx
+from prefetch import Prefetcher
+from solver import count_solutions
+
+"""
+prefetcher: queues fill up to depth in the background, get() serves from them and only counts a miss when empty
+"""
+
+def wait_full(pre, depth, timeout=30):
+    # waits until every queue holds depth boards
+    end = time.time() + timeout
+    while time.time() < end:
+        if all(s["ready"] >= depth for s in pre.stats().values()):
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_fills_and_serves():
+    pre = Prefetcher(depth=2, difficulties=(40, 44), processes=False)
+    try:
+        assert wait_full(pre, 2)
+        stats = pre.stats()
+        assert all(s["refill"] is not None for s in stats.values())
+        puzzle, sol, board_stats = pre.get(44)
+        assert count_solutions(puzzle) == 1
+        assert board_stats["blanks"] == 44
+        assert pre.misses == 0
+        pre.get(30) # no queue for it, made on the spot
+        assert pre.misses == 1
+        assert wait_full(pre, 2) # the board taken from 44 is replaced
+    finally:
+        pre.stop()
+    pre.thread.join(30)
+    assert not pre.thread.is_alive()
+
+def test_big_boards():
+    pre = Prefetcher(depth=1, difficulties=((4, 140),), processes=False)
+    try:
+        assert wait_full(pre, 1)
+        puzzle, sol, stats = pre.get((4, 140))
+        assert len(puzzle) == 256 and dlx.count_solutions(puzzle, 4) == 1
+        assert pre.misses == 0
+    finally:
+        pre.stop()
+
+def test_cancelled_board_ends_the_thread_quietly(monkeypatch):
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", errors.append)
+    class Cancelled(Prefetcher):
+        def make(self, diff):
+            raise CancelledError() # what stop() leaves a board that was still waiting in the pool with
+    pre = Cancelled(depth=1, difficulties=(44,), processes=False)
+    pre.thread.join(30)
+    assert not pre.thread.is_alive()
+    assert errors == []
+    pre.stop()
@@ -0,0 +1,89 @@
+from batchgen import make_line, task_seed
+from puzzleBank import build, PuzzleBank, pack, unpack
+
+"""
+puzzle bank: records round trip, every puzzle is dealt once before any repeats, played bits are kept
+"""
+
+def make_source(path, diffs=(44, 50), count=6):
+    # batchgen file with count puzzles per difficulty
+    with open(path, "w") as f:
+        for diff in diffs:
+            for k in range(count):
+                f.write(make_line((diff, task_seed(0, diff, k))))
+    return path
+
+def test_pack_round_trip():
+    line = make_line((44, 1))
+    puzzle = [int(c) for c in line[:81]]
+    solution = [int(c) for c in line[82:163]]
+    record = pack(puzzle, solution, 300)
+    assert record[-1] == 255 # scores are capped to a byte
+    got_puzzle, got_solution = unpack(record)
+    assert sum(got_puzzle, []) == puzzle
+    assert sum(got_solution, []) == solution
+
+def test_pick_deals_each_once_then_resets(tmp_path):
+    source = make_source(str(tmp_path / "bank.txt"))
+    counts, duplicates = build([source], str(tmp_path / "p.bank"))
+    assert counts == {44: 6, 50: 6} and duplicates == 0
+    bank = PuzzleBank(str(tmp_path / "p.bank"))
+    try:
+        assert bank.difficulties() == [44, 50]
+        dealt = [bank.pick(44)[2] for k in range(6)]
+        assert sorted(dealt) == list(range(6))
+        assert all(0 < bank.score(44, i) <= 255 for i in range(6))
+        assert all(bank.is_played(44, i) for i in range(6))
+        assert not any(bank.is_played(50, i) for i in range(6))
+        bank.pick(44) # all dealt, starts over
+        assert sum(bank.is_played(44, i) for i in range(6)) == 1
+        assert bank.pick(64) is None
+    finally:
+        bank.close()
+
+def test_played_survives_reopening(tmp_path):
+    source = make_source(str(tmp_path / "bank.txt"), diffs=(44,), count=4)
+    build([source], str(tmp_path / "p.bank"))
+    bank = PuzzleBank(str(tmp_path / "p.bank"))
+    first = [bank.pick(44)[2] for k in range(2)]
+    bank.close()
+    bank = PuzzleBank(str(tmp_path / "p.bank"))
+    rest = [bank.pick(44)[2] for k in range(2)]
+    bank.close()
+    assert sorted(first + rest) == [0, 1, 2, 3]
+
+def test_dedup_drops_symmetric_copies(tmp_path):
+    source = make_source(str(tmp_path / "bank.txt"), diffs=(44,), count=3)
+    with open(source) as f:
+        line = f.readline()
+    cells = line[:81]
+    relabeled = "".join(str(10 - int(c)) if c != "0" else "0" for c in cells) # same puzzle with digits swapped
+    solution = "".join(str(10 - int(c)) for c in line[82:163])
+    with open(source, "a") as f:
+        f.write("%s %s 44 seed=99\n" % (relabeled, solution))
+    counts, duplicates = build([source], str(tmp_path / "p.bank"), dedup=True)
+    assert counts == {44: 3} and duplicates == 1
+
+def test_empty_bank(tmp_path):
+    (tmp_path / "empty.txt").write_text("")
+    assert build([str(tmp_path / "empty.txt")], str(tmp_path / "e.bank")) == ({}, 0)
+    bank = PuzzleBank(str(tmp_path / "e.bank"))
+    assert bank.pick(44) is None
+    bank.close()
+
+def test_lines_without_a_score_are_rated(tmp_path):
+    line = make_line((44, 1))
+    puzzle, solution = line[:81], line[82:163]
+    clash = "11" + puzzle[2:] # two 1s in the first row
+    open_grid = "0" * 81 # many solutions, rating still finds one
+    with open(tmp_path / "old.txt", "w") as f:
+        for text in (puzzle, clash, open_grid):
+            f.write("%s %s 44 seed=1\n" % (text, solution)) # a file made before rating, no score=
+    counts, duplicates = build([str(tmp_path / "old.txt")], str(tmp_path / "p.bank"))
+    assert counts == {44: 2} and duplicates == 0 # the clashing puzzle is left out
+    bank = PuzzleBank(str(tmp_path / "p.bank"))
+    try:
+        assert [sum(bank.get(44, i)[0], []) for i in range(2)] == [[int(c) for c in puzzle], [0] * 81]
+        assert all(bank.score(44, i) > 0 for i in range(2))
+    finally:
+        bank.close()
@@ -0,0 +1,60 @@
+from corpus import CORPORA, parse
+from rating import ALL, rate, grade, locked, naked_pair, hidden_pair, x_wing, HIDDEN_SINGLE, GUESS
+
+"""
+difficulty rating: each technique removes exactly the candidates it should, scores follow the hardest one used
+"""
+
+def test_naked_pair():
+    cand = [ALL] * 81
+    cand[0] = cand[1] = 0b11 # 1 and 2 in row 0, both in box 0
+    assert naked_pair([0] * 81, cand)
+    assert cand[0] == cand[1] == 0b11
+    assert cand[5] == cand[10] == ALL & ~0b11 # rest of the row and of the box
+    assert cand[27] == ALL # same column, but one cell of a column can't make a pair
+
+def test_hidden_pair():
+    cand = [ALL & ~0b11] * 81
+    for i in range(81):
+        if i // 9 != 0:
+            cand[i] = ALL
+    cand[0] = cand[1] = ALL # 1 and 2 only fit in cells 0 and 1 of row 0
+    assert hidden_pair([0] * 81, cand)
+    assert cand[0] == cand[1] == 0b11
+    assert cand[9] == ALL
+
+def test_locked_pointing():
+    cand = [ALL] * 81
+    for i in (9, 10, 11, 18, 19, 20):
+        cand[i] &= ~1 # in box 0, 1 only fits on row 0
+    assert locked([0] * 81, cand)
+    assert not any(cand[i] & 1 for i in range(3, 9)) # so it can't go anywhere else on row 0
+    assert cand[0] & 1 and cand[12] & 1 and cand[27] & 1
+
+def test_x_wing():
+    cand = [ALL] * 81
+    for row in (1, 5):
+        for col in range(9):
+            if col not in (2, 6):
+                cand[row*9 + col] &= ~1 # 1 only fits in columns 2 and 6 on rows 1 and 5
+    assert x_wing([0] * 81, cand)
+    for row in range(9):
+        kept = row in (1, 5)
+        assert bool(cand[row*9 + 2] & 1) == kept and bool(cand[row*9 + 6] & 1) == kept
+    assert cand[3] & 1
+
+def test_rate():
+    score, steps = rate(parse(CORPORA["easy"][0]))
+    assert score == HIDDEN_SINGLE and grade(score) == "easy"
+    assert steps["hidden_single"] > 0 and steps["guess"] == 0
+    score, steps = rate(parse(CORPORA["hardest"][0])) # AI Escargot needs guessing
+    assert score > GUESS and steps["guess"] == score - GUESS and grade(score) == "extreme"
+    clash = [0] * 81
+    clash[0] = clash[5] = 7
+    assert rate(clash) == (None, None)
+
+def test_grade():
+    assert grade(None) == "unrated" # no solution, nothing to rate
+    assert grade(0) == "easy"
+    assert grade(GUESS) == "extreme"
+    assert grade(255) == "extreme"
@@ -0,0 +1,61 @@
+from solutions import search, count, enumerate_solutions
+from solver import count_solutions
+from corpus import EASY
+
+"""
+parallel solution counter: matches the bitmask counter, results don't depend on the number of workers
+"""
+
+def loose(k):
+    # easy puzzle with its first k givens taken out, so it has several solutions
+    cells = [int(c) for c in EASY[2]]
+    gone = 0
+    for i in range(81):
+        if cells[i] and gone < k:
+            cells[i] = 0
+            gone += 1
+    return cells
+
+def test_count_matches_count_solutions():
+    for k in (0, 8, 12):
+        cells = loose(k)
+        expected = count_solutions(cells, 10**6)
+        for workers in (0, 2):
+            n, stats = count(cells, workers=workers)
+            assert n == expected
+            assert not stats["capped"]
+
+def test_cap():
+    cells = loose(12)
+    total = count_solutions(cells, 10**6)
+    assert total > 3
+    n, stats = count(cells, cap=3, workers=0)
+    assert n == 3 and stats["capped"]
+    n, stats = count(cells, cap=total, workers=0)
+    assert n == total and not stats["capped"] # exactly cap solutions, the search still finished
+
+def test_enumeration_independent_of_workers():
+    cells = loose(12)
+    inline, stats = enumerate_solutions(cells, cap=10**6, workers=0)
+    pooled, stats = enumerate_solutions(cells, cap=10**6, workers=2)
+    assert inline == pooled
+    assert len({str(g) for g in inline}) == len(inline)
+    capped, stats = enumerate_solutions(cells, cap=5, workers=2)
+    assert capped == inline[:5]
+
+def test_subproblems_only_search_what_is_missing(monkeypatch):
+    import solutions
+    asked = []
+    found = []
+    real = solutions.subproblem
+    def recording(task):
+        result = real(task)
+        asked.append(task[1])
+        found.append(result[0])
+        return result
+    monkeypatch.setattr(solutions, "subproblem", recording)
+    n, stats = count(loose(8), cap=300, workers=0) # 73, 159, 43, ... solutions per subproblem
+    assert n == 300 and stats["capped"]
+    assert len(asked) > 1
+    for k in range(len(asked)):
+        assert asked[k] == 301 - sum(found[:k])
@@ -0,0 +1,70 @@
+from solver import fast_solve, solve_steps, solve_unique
+
+"""
+bitmask solver: solutions are valid, keep the givens and leave the input alone
+"""
+
+EASY = "000957001507400900210008700070820400160049007008000010600000003953286170780030009"
+SEVENTEEN = "000000010400000000020000000000050407008000300001090000300400200050100000000806000"
+HARDEST = "100007090030020008009600500005300900010080002600004000300000010040000007007000300" # AI Escargot
+
+def grid(text):
+    # 9x9 list from an 81 character puzzle
+    return [[int(c) for c in text[r*9:r*9 + 9]] for r in range(9)]
+
+def solved(sol):
+    # True if every row, column and box of a full grid holds 1 to 9
+    units = ([sol[r] for r in range(9)] + [[sol[r][c] for r in range(9)] for c in range(9)] +
+             [[sol[r][c] for r in range(b//3*3, b//3*3 + 3) for c in range(b%3*3, b%3*3 + 3)] for b in range(9)])
+    return all(sorted(unit) == list(range(1, 10)) for unit in units)
+
+def test_solutions_are_valid_and_keep_givens():
+    for text in (EASY, SEVENTEEN, HARDEST):
+        puzzle = grid(text)
+        sol = fast_solve(puzzle)
+        assert sol is not None and solved(sol)
+        assert all(puzzle[r][c] in (0, sol[r][c]) for r in range(9) for c in range(9))
+
+def test_input_is_left_alone():
+    puzzle = grid(HARDEST)
+    before = [row[:] for row in puzzle]
+    fast_solve(puzzle)
+    assert puzzle == before
+
+def test_clashing_givens():
+    puzzle = [[0] * 9 for r in range(9)]
+    puzzle[0][0] = puzzle[0][5] = 7
+    assert fast_solve(puzzle) is None
+
+def test_random_solutions_of_an_empty_grid():
+    import random
+    empty = [[0] * 9 for r in range(9)]
+    first = fast_solve(empty, random.Random(1))
+    assert solved(first)
+    assert first == fast_solve(empty, random.Random(1))
+    assert first != fast_solve(empty, random.Random(2))
+
+def test_solve_steps_solve_in_place():
+    for text, most in ((EASY, 1000), (SEVENTEEN, 50000), (HARDEST, 50000)):
+        puzzle = grid(text)
+        cells = bytearray(sum(puzzle, []))
+        givens = bytes(cells)
+        n = 0
+        for i in solve_steps(cells):
+            assert not givens[i] # givens are never touched
+            n += 1
+            assert n <= most # branching on a cell with 3 candidates while another has 1 runs into the millions
+        assert [list(cells[r*9:r*9 + 9]) for r in range(9)] == fast_solve(puzzle)
+    cells = bytearray(givens)
+    cells[0] = cells[5] = 7
+    assert list(solve_steps(cells)) == []
+
+def test_solve_unique():
+    puzzle = grid(EASY)
+    sol, n = solve_unique(puzzle)
+    assert n == 1 and sol == fast_solve(puzzle)
+    puzzle[0] = [0] * 9
+    puzzle[1] = [0] * 9
+    assert solve_unique(puzzle)[1] == 2
+    puzzle[0][0] = puzzle[0][5] = 7
+    assert solve_unique(puzzle) == (None, 0)